@@ -29,7 +29,7 @@ class Config(pilo.Form):
 
 class Client(threading.local):
 
-    accept_type = mimes.json.content_type
+    mime = mimes.json
 
     def __init__(self, config):
         self.session = requests.Session()
@@ -69,12 +69,12 @@ class Client(threading.local):
     def method(self, method, uri, data, params, headers, source=True):
         url = urlparse.urljoin(self.config.url, uri)
         headers.update({
-            'accept-type': self.accept_type,
+            'accept': self.mime.content_type,
         })
         headers.update(self.config.headers)
         if data is not None:
-            text = mimes.json.encode(data)
-            headers['content-type'] = mimes.json.content_type
+            text = self.mime.encode(data)
+            headers['content-type'] = self.mime.content_type
         else:
             text = None
         if self.config.headers:
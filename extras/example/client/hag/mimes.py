@@ -1,11 +1,16 @@
 import collections
 import datetime
-import json
+import importlib
 import logging
 import urllib
 
 import pilo
 
+try:
+    import msgpack as msgpack_backend
+except ImportError:
+    msgpack_backend = None
+
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,8 @@ MIME = collections.namedtuple(
 def encoder_for(content_type):
     if content_type == json.content_type:
         return json.encode
+    if content_type == msgpack.content_type and msgpack_backend:
+        return msgpack.encode
     if content_type == url.content_type:
         return url.encode
     raise LookupError('No encoder for "{0}"'.format(content_type))
@@ -25,12 +32,16 @@ def encoder_for(content_type):
 def decoder_for(content_type):
     if content_type == json.content_type:
         return json.decode
+    if content_type == msgpack.content_type and msgpack_backend:
+        return msgpack.decode
     raise LookupError('No decoder for "{0}"'.format(content_type))
 
 
 def source_for(content_type):
     if content_type == json.content_type:
         return json.source
+    if content_type == msgpack.content_type and msgpack_backend:
+        return msgpack.source
     if content_type == url.content_type:
         return url.source
     raise LookupError('No source for "{0}"'.format(content_type))
@@ -38,12 +49,78 @@ def source_for(content_type):
 
 # json
 
-class JSONEncoder(json.JSONEncoder):
-
-    def __init__(self, indent=4, sort_keys=True, errors='strict'):
-        super(JSONEncoder, self).__init__(indent=indent, sort_keys=sort_keys)
+JSON_BACKENDS = ['simplejson', 'json']
+
+
+def json_backends(names=None):
+    """
+    Imports available `json` compatible modules, in order of preference.
+    """
+    backends = []
+    for name in names or JSON_BACKENDS:
+        try:
+            backends.append(importlib.import_module(name))
+        except ImportError:
+            pass
+    return backends
+
+
+json_backend = json_backends()[0]
+
+
+def json_loads(text, encoding=None, backend=None):
+    """
+    Decodes using `backend` (defaults to `json_backend`) with the output of
+    the stdlib `json`, i.e. strings are always `unicode`. Given `str` text
+    `simplejson` decodes ASCII only strings as `str`, so text is decoded
+    first.
+    """
+    if isinstance(text, str):
+        text = text.decode(encoding or 'utf-8')
+    return (backend or json_backend).loads(text)
+
+
+class JSONSource(pilo.source.JsonSource):
+
+    backend = json_backend
+
+    def __init__(self, text, encoding=None, strict=False, location=None):
+        # NOTE: pilo.source.JsonSource.__init__ hard codes stdlib json.loads
+        pilo.source.Source.__init__(self)
+        self.strict = strict
+        self.location = location
+        self.text = text
+        self.data = json_loads(text, encoding, self.backend)
+
+
+class JSONEncoder(object):
+    """
+    Encodes using `backend` (defaults to `json_backend`) with the output of
+    the stdlib `json`.
+    """
+
+    def __init__(self,
+                 indent=4,
+                 sort_keys=True,
+                 separators=(', ', ': '),
+                 errors='strict',
+                 backend=None):
+        self.backend = backend or json_backend
+        kwargs = dict(
+            indent=indent,
+            sort_keys=sort_keys,
+            separators=separators,
+            default=self.default,
+        )
+        if self.backend.__name__ == 'simplejson':
+            # stdlib semantics
+            kwargs.update(use_decimal=False, namedtuple_as_object=False)
+        self.encoder = self.backend.JSONEncoder(**kwargs)
         self.errors = errors
 
+    def encode(self, o):
+        return self.encoder.encode(o)
+
     def default(self, o):
         if isinstance(o, datetime.datetime):
             return self._datetime(o)
@@ -67,8 +144,44 @@ class JSONEncoder(json.JSONEncoder):
 json = MIME(
     content_type='application/json',
     encode=JSONEncoder().encode,
-    decode=json.loads,
-    source=pilo.source.JsonSource,
+    decode=json_loads,
+    source=JSONSource,
+)
+
+
+# msgpack
+
+class MessagePackSource(pilo.source.JsonSource):
+
+    def __init__(self, text, encoding=None, strict=False, location=None):
+        pilo.source.Source.__init__(self)
+        self.strict = strict
+        self.location = location
+        self.text = text
+        self.data = msgpack_backend.unpackb(text, raw=False)
+
+
+class MessagePackEncoder(object):
+
+    def __init__(self, errors='strict'):
+        self.errors = errors
+        self.default = JSONEncoder(errors=errors).default
+
+    def encode(self, o):
+        return msgpack_backend.packb(
+            o, default=self.default, use_bin_type=False,
+        )
+
+
+def msgpack_decode(text):
+    return msgpack_backend.unpackb(text, raw=False)
+
+
+msgpack = MIME(
+    content_type='application/msgpack',
+    encode=MessagePackEncoder().encode,
+    decode=msgpack_decode,
+    source=MessagePackSource,
 )
 
 
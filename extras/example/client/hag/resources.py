@@ -48,7 +48,7 @@ class Page(pilo.Form):
              if self.previous_link else None
         )
 
-    last = pilo.fields.String()
+    last_link = pilo.fields.String()
 
     @property
     def last(self):
@@ -20,6 +20,10 @@ setuptools.setup(
         'pilo >=0.3.2,<0.4',
         'requests >=2.3.0,<2.4',
     ],
+    extras_require={
+        'speedups': ['simplejson >=3.0'],
+        'msgpack': ['msgpack >=0.5.2'],
+    },
     packages=setuptools.find_packages('.', exclude=('tests', 'tests.*')),
     classifiers=[
         'Development Status :: 4 - Beta',
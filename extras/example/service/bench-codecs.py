@@ -0,0 +1,96 @@
+"""
+Compares the table driven ``hags.codecs`` alphabets against the digit at a
+time implementation they replaced, and times the base32 codec:
+
+.. code:: bash
+
+    $ python bench-codecs.py
+    $ python bench-codecs.py --count 10000 --repeat 5
+
+"""
+import argparse
+import timeit
+import uuid
+
+from hags import codecs
+
+
+def legacy_encode(num, alphabet, base):
+    encode = ''
+    if (num < 0):
+        return ''
+    while (num >= base):
+        mod = num % base
+        encode = alphabet[mod] + encode
+        num = num / base
+    if (num):
+        encode = alphabet[num] + encode
+    return encode
+
+
+def legacy_decode(s, alphabet, base):
+    decoded = 0
+    multi = 1
+    s = s[::-1]
+    for char in s:
+        decoded += multi * alphabet.index(char)
+        multi = multi * base
+    return decoded
+
+
+def bench(name, func, repeat):
+    took = min(timeit.repeat(func, number=1, repeat=repeat))
+    print '{0:<32} {1:.4f}s'.format(name, took)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    nums = [uuid.uuid4().int for _ in xrange(args.count)]
+    for alphabet in [codecs.base58, codecs.base62]:
+        chars, base = alphabet.chars, alphabet.base
+        encoded = alphabet.encode_many(nums)
+        fixed = alphabet.encode_many(nums, alphabet.uuid_width)
+        assert encoded == [legacy_encode(num, chars, base) for num in nums]
+        assert alphabet.decode_many(encoded) == nums
+        assert alphabet.decode_many(fixed) == nums
+
+        print 'base{0} x {1}'.format(base, args.count)
+        bench(
+            'legacy encode',
+            lambda: [legacy_encode(num, chars, base) for num in nums],
+            args.repeat,
+        )
+        bench('encode_many', lambda: alphabet.encode_many(nums), args.repeat)
+        bench(
+            'encode_many (fixed width)',
+            lambda: alphabet.encode_many(nums, alphabet.uuid_width),
+            args.repeat,
+        )
+        bench(
+            'legacy decode',
+            lambda: [legacy_decode(s, chars, base) for s in encoded],
+            args.repeat,
+        )
+        bench('decode_many', lambda: alphabet.decode_many(encoded), args.repeat)
+
+    encoded = [codecs.base32_encode(num) for num in nums]
+    assert [codecs.base32_decode(s) for s in encoded] == nums
+    print 'base32 x {0}'.format(args.count)
+    bench(
+        'encode',
+        lambda: [codecs.base32_encode(num) for num in nums],
+        args.repeat,
+    )
+    bench(
+        'decode',
+        lambda: [codecs.base32_decode(s) for s in encoded],
+        args.repeat,
+    )
+
+
+if __name__ == '__main__':
+    main()
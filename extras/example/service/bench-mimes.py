@@ -0,0 +1,69 @@
+"""
+Payload size and encode time of the example resources for each JSON mime:
+
+.. code:: bash
+
+    $ python bench-mimes.py
+    $ python bench-mimes.py --count 1000 --repeat 5
+
+"""
+import argparse
+import datetime
+import timeit
+import uuid
+
+from hags import api, mimes, models
+
+
+def sample(count):
+    now = datetime.datetime.utcnow()
+    user = models.User(
+        id=uuid.uuid4(),
+        created_at=now,
+        updated_at=now,
+        email_address=u'bench@example.com',
+        enabled=True,
+    )
+    prisoners = [
+        models.Prisoner(
+            id=uuid.uuid4(),
+            created_at=now,
+            updated_at=now,
+            expires_at=now + datetime.timedelta(hours=1),
+            user_id=user.id,
+            user=user,
+            state=models.Prisoner.states.ALIVE,
+            secret=u'benchmark',
+            misses=1,
+            guesses=[u'b', u'z'],
+        )
+        for _ in xrange(count)
+    ]
+    return [
+        ('user', api.User(user)),
+        ('prisoners', [api.Prisoner(prisoner) for prisoner in prisoners]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with api.app.test_request_context():
+        for name, resource in sample(args.count):
+            print name
+            for mime_name in ['pretty_json', 'json']:
+                encode = getattr(mimes, mime_name).encode
+                size = len(encode(resource))
+                took = min(timeit.repeat(
+                    lambda: encode(resource), number=1, repeat=args.repeat,
+                ))
+                print '{0:<16} {1:>10} bytes {2:.4f}s'.format(
+                    mime_name, size, took
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Objects per second rendered as the example resources with (compiled) and
+without (pilo) their compiled mapping plans:
+
+.. code:: bash
+
+    $ python bench-resources.py
+    $ python bench-resources.py --count 5000 --repeat 5
+
+"""
+import argparse
+import datetime
+import timeit
+import uuid
+
+from hags import api, models
+
+
+def sample(count):
+    now = datetime.datetime.utcnow()
+    users = [
+        models.User(
+            id=uuid.uuid4(),
+            created_at=now,
+            updated_at=now,
+            email_address=u'bench@example.com',
+            enabled=True,
+        )
+        for _ in xrange(count)
+    ]
+    prisoners = [
+        models.Prisoner(
+            id=uuid.uuid4(),
+            created_at=now,
+            updated_at=now,
+            expires_at=now + datetime.timedelta(hours=1),
+            user_id=user.id,
+            user=user,
+            state=models.Prisoner.states.ALIVE,
+            secret=u'benchmark',
+            misses=1,
+            guesses=[u'b', u'z'],
+        )
+        for user in users
+    ]
+    return [(api.User, users), (api.Prisoner, prisoners)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with api.app.test_request_context():
+        for resource_cls, objs in sample(args.count):
+            print resource_cls.__name__
+            for name, compiled in [('pilo', False), ('compiled', True)]:
+                resource_cls.compiled = compiled
+                try:
+                    took = min(timeit.repeat(
+                        lambda: [resource_cls(obj) for obj in objs],
+                        number=1,
+                        repeat=args.repeat,
+                    ))
+                finally:
+                    del resource_cls.compiled
+                print '{0:<16} {1:>10.0f} objs/s'.format(name, len(objs) / took)
+
+
+if __name__ == '__main__':
+    main()
@@ -56,33 +56,106 @@ class RequestUserMixin(flask.Request):
 
 class RequestMIMEMixin(object):
 
-    def accept_match(self, *mime_types):
-        mime_type = self.accept_mimetypes.best_match(
-            mime_types, default=mime_types[0]
-        )
-        if not mime_type:
-            raise exc.BadRequest(
+    mime_registry = mimes.registry
+
+    @property
+    def pretty(self):
+        return self.args.get('pretty', '').lower() in ('1', 'true')
+
+    def accept_mime(self):
+        mime = self.mime_registry.accept(self.headers.get('Accept', ''))
+        if mime is None:
+            raise exc.NotAcceptable(
                 'No matching accept mime-type'
             )
+        if mime is mimes.json and self.pretty:
+            return mimes.pretty_json
+        return mime
 
     def accept_encoder(self):
-        self.accept_match(mimes.json.accept_type)
-        return mimes.json.accept_type, mimes.json.encode
+        mime = self.accept_mime()
+        return mime.accept_type, mime.encode
+
+    def accept_streamer(self):
+        mime = self.accept_mime()
+
+        def stream(o):
+            return flask.stream_with_context(mime.stream(o))
+
+        return mime.accept_type, stream
 
     def content_source(self):
-        if self.mimetype == mimes.json.content_type:
-            charset = self.mimetype_params.get('charset') or None
-            return mimes.json.source(
-                text=self.get_data(), encoding=charset
+        mime = self.mime_registry.content(self.mimetype)
+        if mime is None:
+            raise exc.BadRequest(
+                'Unsupported content mime-type "{}"'.format(self.mimetype)
             )
-        raise exc.BadRequest(
-            'Unsupported content mime-type "{}"'.format(self.mimetype)
-        )
+        charset = self.mimetype_params.get('charset') or None
+        return mime.source(text=self.get_data(), encoding=charset)
+
+
+class RequestConditionalMixin(flask.Request):
+
+    def conditional(self, resource):
+        """
+        Responds with `resource` encoded as accepted or, if `If-None-Match`
+        has its current etag (see `hype.Resource.etag`), an empty 304. Types
+        with a `version` are not even encoded for a 304.
+        """
+        mime = self.accept_mime()
+        variant = mime.accept_type
+        if mime is mimes.pretty_json:
+            variant += ';pretty'
+        encoded = None
+        etag = resource.etag(variant)
+        if etag is None:
+            encoded = mime.encode(resource)
+            etag = resource.etag(variant, encoded)
+        if etag in self.if_none_match:
+            response = Response(status=304)
+        else:
+            if encoded is None:
+                encoded = mime.encode(resource)
+            response = Response(
+                status=200, response=encoded, content_type=mime.accept_type,
+            )
+        response.set_etag(etag)
+        return response
+
+
+class RequestFieldsMixin(flask.Request):
+
+    @werkzeug.utils.cached_property
+    def fields(self):
+        """
+        Sparse fieldset requested as e.g. `?fields=id,link` or `None`.
+        """
+        value = self.args.get('fields')
+        if value is None:
+            return None
+        return [name for name in value.replace(' ', '').split(',') if name]
+
+    def fieldset(self, resource_cls):
+        if self.fields is None:
+            return None
+        try:
+            resource_cls.fieldset(self.fields)
+        except ValueError as ex:
+            raise exc.BadRequest(str(ex))
+        return self.fields
+
+    def project(self, resource):
+        fields = self.fieldset(type(resource))
+        if fields is None:
+            return resource
+        return resource.project(fields)
 
 
 class Request(
           RequestUserMixin,
           RequestMIMEMixin,
+          RequestConditionalMixin,
+          RequestFieldsMixin,
           RequestAdminMixin,
           flask.Request,
       ):
@@ -113,7 +186,7 @@ class Application(flask.Flask):
         exc_info = sys.exc_info()
         try:
             encode_type, encode = request.accept_encoder()
-        except exc.BadRequest:
+        except exc.NotAcceptable:
             flask.app.reraise(*exc_info)
         try:
             error = exc.Error.cast(ex)
@@ -136,7 +209,7 @@ app = Application()
 
 class Resource(hype.Resource):
 
-    registry = hype.Registry(app)
+    registry = hype.Registry(app, identity_map=True, lazy_converters=True)
 
 
 from . import exc
@@ -6,6 +6,7 @@ from werkzeug.exceptions import (
     NotFound,
     Forbidden,
     BadRequest,
+    NotAcceptable,
     Unauthorized,
     ServiceUnavailable,
 )
@@ -16,7 +17,7 @@ from . import Resource
 
 
 def cannot_guess(ex):
-    prisoner = Resource.registry.adapt(ex.prisoner)
+    prisoner = Resource.registry.adapt(ex.prisoner, lazy=True)
     description = (
         'Cannot guess "{0}" for prisoner {1} in state "{2}"'
         .format(ex.guess, prisoner.link, prisoner.state)
@@ -29,7 +30,7 @@ def cannot_guess(ex):
 
 
 def cannot_giveup(ex):
-    prisoner = Resource.registry.adapt(ex.prisoner)
+    prisoner = Resource.registry.adapt(ex.prisoner, lazy=True)
     description = (
         'Cannot suicide prisoner {0} in state "{1}"'
         .format(prisoner.link, prisoner.state)
@@ -1,3 +1,5 @@
+import urllib
+
 from flask.ext import hype
 import pilo
 import sqlalchemy.orm as saorm
@@ -24,6 +26,7 @@ class Id(hype.Id):
             prefix = kwargs.pop('prefix')
             encoding = kwargs.pop('encoding', 'base58')
             kwargs['codec'] = codecs.Id(prefix=prefix, encoding=encoding)
+            kwargs.setdefault('cache', 1024)
         super(Id, self).__init__(*args, **kwargs)
 
 
@@ -45,8 +48,9 @@ class Binding(hype.Binding):
         if isinstance(obj, Resource):
             obj.obj = self.cast(obj.obj)
             return obj
-        if not self.adapts(obj):
-            raise TypeError('{0}.adapts({1}) is False'.format(type(self), obj))
+        # e.g. adapted by another binding
+        if getattr(obj, 'id', None) is None:
+            raise TypeError('{0} has no id'.format(obj))
         cast_obj = self.get(obj.id)
         if cast_obj is not None:
             return cast_obj
@@ -61,24 +65,41 @@ class Binding(hype.Binding):
 class DBBinding(Binding):
 
     def __init__(self, *args, **kwargs):
-        self.auto_cache = kwargs.pop('auto_cache', False)
         super(DBBinding, self).__init__(name='db', *args, **kwargs)
 
     def get(self, decodec_id):
-        obj = self.cls.query.get(decodec_id)
-        if obj is not None and self.auto_cache:
-            obj.cache()
-        return obj
+        return self.cls.query.get(decodec_id)
+
+    def get_many(self, decoded_ids):
+        objs = dict(
+            (obj.id, obj)
+            for obj in self.cls.query.filter(self.cls.id.in_(decoded_ids))
+        )
+        return [objs.get(decoded_id) for decoded_id in decoded_ids]
 
 
 class CacheBinding(Binding):
 
     def __init__(self, *args, **kwargs):
-        super(CacheBinding, self).__init__(name='cache', *args, **kwargs)
+        super(CacheBinding, self).__init__(
+            name='cache', cache=True, *args, **kwargs
+        )
 
     def get(self, decodec_id):
         return self.cls.get(decodec_id)
 
+    def get_many(self, decoded_ids):
+        if not hasattr(self.cls, 'get_many'):
+            return super(CacheBinding, self).get_many(decoded_ids)
+        return self.cls.get_many(decoded_ids)
+
+    def fill(self, obj):
+        self.cls(obj).save()
+
+    def evict(self, decoded_id):
+        if hasattr(self.cls, 'delete'):
+            self.cls.delete(decoded_id)
+
 
 class Anonymous(Resource):
 
@@ -90,6 +111,10 @@ class Anonymous(Resource):
 
 class User(Resource):
 
+    class Options:
+
+        version = 'updated_at'
+
     _type_ = pilo.fields.String().constant('user_t')
 
     link = Link('user.show', user='id')
@@ -128,7 +153,8 @@ class User(Resource):
             return
         if not obj.authenticate(password):
             return
-        return cls(obj)
+        # mostly used to authorize, mapped in full only if rendered
+        return cls(obj, lazy=True)
 
     class Create(RequestForm):
 
@@ -157,8 +183,10 @@ class User(Resource):
 
 
 User.bind(
-    CacheBinding(models.User.Cached),
+    hype.Breaker(CacheBinding(models.User.Cached), slow=0.1),
     DBBinding(models.User),
+    fill='deferred',
+    negative_cache=hype.NegativeCache(ttl=5),
 )
 
 
@@ -167,8 +195,7 @@ User.bind(
 def show_user(user):
     user = request.user if user is None else user
     request.authorize(user, 'show')
-    encode_type, encode = request.accept_encoder()
-    return Response(status=200, response=encode(user), content_type=encode_type)
+    return request.conditional(request.project(user))
 
 
 @app.route('/users/', methods=['POST'], endpoint='user.create')
@@ -229,17 +256,32 @@ def delete_password(user, password):
 
 class Prisoner(Resource):
 
+    class Options:
+
+        dependencies = {
+            'secret': ['secret', 'hits'],
+            'hits': ['secret', 'guesses'],
+            'misses': ['secret', 'guesses'],
+        }
+
+        version = 'updated_at'
+
     _type_ = pilo.fields.String().constant('prisoner_t')
 
     link = Link('prisoner.show', prisoner='id')
 
     id = Id(prefix='pr-')
 
-    user_link = Link('user.show', user='user.id')
+    user_link = Link('user.show', user='user_id')
+
+    @property
+    def user_id(self):
+        # e.g. models.Prisoner.Cached has no user
+        return User.id.encode(self.obj.user_id)
 
     @property
     def user(self):
-        return User(self.obj.user)
+        return User.get(self.user_id, lazy=True)
 
     started_at = pilo.fields.Datetime('created_at')
 
@@ -308,6 +350,46 @@ class Prisoner(Resource):
         models.db_session.commit()
         return cls(obj)
 
+    class Index(RequestForm):
+
+        offset = pilo.fields.Integer(default=0).min(0)
+
+        limit = pilo.fields.Integer(default=25).range(1, 100)
+
+        def link(self, offset):
+            params = [('offset', offset), ('limit', self.limit)]
+            if request.fields is not None:
+                params.append(('fields', ','.join(request.fields)))
+            return '{0}?{1}'.format(request.base_url, urllib.urlencode(params))
+
+        def __call__(self, query):
+            # validated up front, items are mapped as the response streams
+            fields = request.fieldset(Prisoner)
+            total = query.count()
+            last = max(total - 1, 0) // self.limit * self.limit
+            previous = max(self.offset - self.limit, 0)
+            following = self.offset + self.limit
+            objs = (
+                query
+                .order_by(models.Prisoner.created_at, models.Prisoner.id)
+                .offset(self.offset)
+                .limit(self.limit)
+            )
+            return {
+                'link': self.link(self.offset),
+                'number': self.offset // self.limit,
+                'size': self.limit,
+                'first_link': self.link(0),
+                'previous_link': self.link(previous) if self.offset else None,
+                'next_link': (
+                    self.link(following) if following < total else None
+                ),
+                'last_link': self.link(last),
+                'total': total,
+                # mapped a chunk at a time as the response streams
+                'items': Prisoner.render_many(objs, fields=fields),
+            }
+
     class Guess(RequestForm):
 
         guess = pilo.fields.String(None, length=1)
@@ -317,17 +399,24 @@ class Prisoner(Resource):
         self.b.db.cast(self)
         hit = self.obj.guess(form.guess)
         models.db_session.commit()
+        # all models.Prisoner.guess (and what it transitions to) updates
+        self.refresh(fields=[
+            'guesses', 'misses', 'state', 'updated_at', 'terminated_at',
+        ])
         return hit
 
     def suicide(self):
         self.b.db.cast(self)
         self.obj.give_up()
         models.db_session.commit()
+        self.refresh(fields=['state', 'updated_at', 'terminated_at'])
 
 
 Prisoner.bind(
-    CacheBinding(models.Prisoner.Cached),
+    hype.Breaker(CacheBinding(models.Prisoner.Cached), slow=0.1),
     DBBinding(models.Prisoner),
+    fill='deferred',
+    negative_cache=hype.NegativeCache(ttl=5),
 )
 
 @app.route('/users/<User:user>/prisoners/', methods=['GET'], endpoint='prisoner.index')
@@ -335,9 +424,11 @@ Prisoner.bind(
 def index_prisoners(user):
     user = request.user if user is None else user
     request.authorize(Prisoner, 'index', user)
-    encode_type, encode = request.accept_encoder()
-    page = Prisoner.Index(request.content_source())(request.user.prisoner)
-    return Response(status=200, response=encode(page), content_type=encode_type)
+    stream_type, stream = request.accept_streamer()
+    page = Prisoner.Index(request.args.to_dict())(
+        user.b.db.cast(user.obj).prisoners
+    )
+    return Response(status=200, response=stream(page), content_type=stream_type)
 
 
 @app.route('/users/<User:user>/prisoners/', methods=['POST'], endpoint='prisoner.create')
@@ -353,8 +444,7 @@ def create_prisoner(user):
 @app.route('/prisoners/<Prisoner:prisoner>', methods=['GET'], endpoint='prisoner.show')
 def show_prisoner(prisoner):
     request.authorize(prisoner, 'show')
-    encode_type, encode = request.accept_encoder()
-    return Response(status=200, response=encode(prisoner), content_type=encode_type)
+    return request.conditional(request.project(prisoner))
 
 
 @app.route('/prisoners/<Prisoner:prisoner>/guess', methods=['POST'], endpoint='prisoner.guess')
@@ -382,7 +472,7 @@ class Stats(Resource):
 
     @property
     def user(self):
-        return User.get(User.id.encode(self.obj.user_id))
+        return User.get(User.id.encode(self.obj.user_id), lazy=True)
 
     prisoners = pilo.fields.Integer('total', min_value=0)
 
@@ -421,7 +511,11 @@ class Stats(Resource):
         return (self.obj.hits / float(self.total)) * 100.0
 
 
-Stats.bind(CacheBinding(models.Stats))
+Stats.bind(hype.Breaker(CacheBinding(models.Stats), slow=0.1))
+
+
+# e.g. so caches are not left serving what was just written
+models.Written.listeners.append(Resource.registry.written)
 
 
 @app.route('/users/<User:user>/stats', methods=['GET'], endpoint='stats.show')
@@ -430,8 +524,7 @@ def show_stats(user):
     if user is None:
         user = request.user
     request.authorize(Stats, 'show', user)
-    encode_type, encode = request.accept_encoder()
     stats = user.stats
     if stats is None:
         raise exc.ServiceUnavailable()
-    return Response(status=200, response=encode(user.stats), content_type=encode_type)
+    return request.conditional(stats)
@@ -5,22 +5,63 @@ __all__ = [
 ]
 
 import codecs
+import functools
+import math
+import re
 import uuid
 
 
 class Id(object, codecs.Codec):
+    """
+    Encodes UUIDs as text. Only what `encode` produces decodes (ignoring case
+    for "hex"), so each id has one encoding: `fixed` width ids are always
+    zero padded to the full width, others never are.
+    """
 
-    def __init__(self, encoding='hex', prefix=None):
+    def __init__(self, encoding='hex', prefix=None, fixed=False):
+        lookahead = ''
         if encoding == 'hex':
             self._encode, self._decode = base32_encode, base32_decode
-        elif encoding == 'base58':
-            self._encode, self._decode = base58_encode, base58_decode
-        elif encoding == 'base62':
-            self._encode, self._decode = base62_encode, base62_decode
+            self._encode_many = lambda nums: map(base32_encode, nums)
+            chars, width = base32_alphabet + base32_alphabet.upper(), '{26}'
+        elif encoding in ('base58', 'base62'):
+            alphabet = base58 if encoding == 'base58' else base62
+            self._encode = alphabet.encode
+            self._decode = functools.partial(
+                _canonical_decode, alphabet, fixed,
+            )
+            self._encode_many = alphabet.encode_many
+            if fixed:
+                self._encode = functools.partial(
+                    alphabet.encode, width=alphabet.uuid_width
+                )
+                self._encode_many = functools.partial(
+                    alphabet.encode_many, width=alphabet.uuid_width
+                )
+                width = '{{{0}}}'.format(alphabet.uuid_width)
+            else:
+                # no redundant leading zero digits
+                lookahead = '(?!{0}.)'.format(re.escape(alphabet.chars[0]))
+                width = '{{1,{0}}}'.format(alphabet.uuid_width)
+            chars = alphabet.chars
         else:
             raise ValueError('Invalid encoding {0}'.format(encoding))
         self.encoding = encoding
         self.prefix = prefix
+        self.fixed = fixed
+        self._pattern = re.compile(r'{0}{1}[{2}]{3}\Z'.format(
+            re.escape(prefix or ''), lookahead, chars, width,
+        ))
+
+    def match(self, input):
+        """
+        Cheap check of prefix, alphabet and length. A `False` means `input`
+        will not decode, a `True` that it very likely will.
+        """
+        return (
+            isinstance(input, basestring) and
+            self._pattern.match(input) is not None
+        )
 
     def encode(self, input, errors='strict'):
         if not isinstance(input, uuid.UUID):
@@ -34,6 +75,18 @@ class Id(object, codecs.Codec):
             value = encoded
         return value
 
+    def encode_many(self, inputs, errors='strict'):
+        for input in inputs:
+            if not isinstance(input, uuid.UUID):
+                raise TypeError(
+                    'Expected instance of {0} not {1}'
+                    .format(uuid.UUID, type(input))
+                )
+        encoded = self._encode_many([input.int for input in inputs])
+        if self.prefix:
+            return [self.prefix + value for value in encoded]
+        return encoded
+
     def decode(self, input, errors='strict'):
         if not isinstance(input, basestring):
             raise TypeError(
@@ -49,65 +102,125 @@ class Id(object, codecs.Codec):
         return uuid.UUID(int=decoded)
 
 
-def base_encode(num, alphabet, base):
+class Alphabet(object):
     """
-    Adapted from https://gist.github.com/ianoxley/865912
+    Table driven positional encoding of non-negative integers. Digits are
+    converted two at a time through precomputed tables of every digit pair, so
+    a 128-bit UUID takes 11 divmods to encode and 11 dict lookups to decode.
     """
-    encode = ''
-
-    if (num < 0):
-        return ''
-
-    while (num >= base):
-        mod = num % base
-        encode = alphabet[mod] + encode
-        num = num / base
-
-    if (num):
-        encode = alphabet[num] + encode
 
-    return encode
+    def __init__(self, chars):
+        self.chars = chars
+        self.base = len(chars)
+        self.square = self.base * self.base
+        self.digits = dict((char, i) for i, char in enumerate(chars))
+        self.pairs = [a + b for a in chars for b in chars]
+        self.pair_digits = dict((pair, i) for i, pair in enumerate(self.pairs))
+        self.uuid_width = int(math.ceil(128 / math.log(self.base, 2)))
+
+    def encode(self, num, width=None):
+        if num < 0:
+            return ''
+        square, pairs = self.square, self.pairs
+        parts = []
+        while num:
+            num, pair = divmod(num, square)
+            parts.append(pairs[pair])
+        parts.reverse()
+        # zero is the zero digit, not nothing
+        encoded = ''.join(parts).lstrip(self.chars[0]) or self.chars[0]
+        if width is not None:
+            encoded = encoded.rjust(width, self.chars[0])
+        return encoded
+
+    def decode(self, s):
+        if not s:
+            raise ValueError('"" is not base{0} encoded'.format(self.base))
+        square, pair_digits = self.square, self.pair_digits
+        odd = len(s) % 2
+        try:
+            decoded = self.digits[s[0]] if odd else 0
+            for i in xrange(odd, len(s), 2):
+                decoded = decoded * square + pair_digits[s[i:i + 2]]
+        except KeyError:
+            raise ValueError('"{0}" is not base{1} encoded'.format(s, self.base))
+        return decoded
+
+    def encode_many(self, nums, width=None):
+        encode = self.encode
+        return [encode(num, width) for num in nums]
+
+    def decode_many(self, ss):
+        decode = self.decode
+        return [decode(s) for s in ss]
+
+
+def _canonical_decode(alphabet, fixed, s):
+    # as Id encodes, so one encoding per id
+    if fixed:
+        canonical = len(s) == alphabet.uuid_width
+    else:
+        canonical = len(s) <= alphabet.uuid_width and (
+            len(s) == 1 or not s.startswith(alphabet.chars[0])
+        )
+    if not canonical:
+        raise ValueError(
+            '"{0}" is not a canonical base{1} id'.format(s, alphabet.base)
+        )
+    return alphabet.decode(s)
+
+
+base32_alphabet = '0123456789abcdefghijklmnopqrstuv'
+
+base32 = Alphabet(base32_alphabet)
+
+_base32_shifts = range(120, -1, -10)
 
 
-def base_decode(s, alphabet, base):
+def base32_encode(num):
     """
-    Adapted from https://gist.github.com/ianoxley/865912
+    Encodes a 128-bit integer as 26 characters of RFC 4648 "base32hex"
+    (lower-cased, unpadded) which, unlike the standard base32 alphabet, sorts
+    lexicographically in numeric order. The 128 bits plus 2 bits of padding
+    are emitted as 13 pairs of characters by shifting rather than dividing.
     """
-    decoded = 0
-    multi = 1
-    s = s[::-1]
-    for char in s:
-        decoded += multi * alphabet.index(char)
-        multi = multi * base
-
-    return decoded
+    if not 0 <= num < 1 << 128:
+        raise ValueError('{0} is not a 128-bit integer'.format(num))
+    num <<= 2
+    pairs = base32.pairs
+    return ''.join([pairs[(num >> shift) & 1023] for shift in _base32_shifts])
 
 
-def base32_encode(num):
-    raise NotImplementedError
+_base32_chars = frozenset(base32_alphabet + base32_alphabet.upper())
 
 
 def base32_decode(s):
-    raise NotImplementedError
+    """
+    Inverse of ``base32_encode``, case-insensitive. The "base32hex" digits are
+    exactly the ASCII ones ``int`` accepts in base 32. The 2 bits of padding
+    must be zero so each id has one encoding (ignoring case).
+    """
+    if len(s) != 26 or not _base32_chars.issuperset(s):
+        raise ValueError('"{0}" is not a base32 encoded 128-bit id'.format(s))
+    num = int(s, 32)
+    if num & 3:
+        raise ValueError('"{0}" has non-zero padding bits'.format(s))
+    return num >> 2
 
 
 base58_alphabet = '123456789abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ'
 
+base58 = Alphabet(base58_alphabet)
 
-def base58_encode(num):
-    return base_encode(num, base58_alphabet, 58)
-
+base58_encode = base58.encode
 
-def base58_decode(s):
-    return base_decode(s, base58_alphabet, 58)
+base58_decode = base58.decode
 
 
 base62_alphabet = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
+base62 = Alphabet(base62_alphabet)
 
-def base62_encode(num):
-    return base_encode(num, base62_alphabet, 62)
-
+base62_encode = base62.encode
 
-def base62_decode(s):
-    return base_decode(s, base62_alphabet, 62)
+base62_decode = base62.decode
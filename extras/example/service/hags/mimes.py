@@ -1,37 +1,245 @@
 __all__ = [
     'json',
+    'pretty_json',
+    'msgpack',
+    'internal',
     'url',
+    'registry',
 ]
 
 import collections
 import datetime
+import importlib
 import logging
-import json
 import urllib
 import uuid
 
+from flask.ext import hype
 import pilo
+import werkzeug.datastructures
+import werkzeug.http
+
+try:
+    import msgpack as msgpack_backend
+except ImportError:
+    msgpack_backend = None
 
 
 logger = logging.getLogger(__name__)
 
 
 MIME = collections.namedtuple('MIME', [
-    'accept_type', 'source', 'content_type', 'encode',
+    'accept_type', 'source', 'content_type', 'encode', 'stream',
 ])
 
 
-# json
-
-JSONSource = pilo.source.JsonSource
+class Registry(object):
+    """
+    MIMEs negotiable for requests and responses, in order of preference.
+    Decisions for `Accept` headers are memoized by raw header value.
+    """
+
+    def __init__(self, *mimes, **kwargs):
+        self.mimes = []
+        self.accepts = hype.LRU(maxsize=kwargs.pop('maxsize', 256))
+        for mime in mimes:
+            self.register(mime)
+
+    def register(self, mime):
+        self.mimes.append(mime)
+        self.accepts.clear()
+
+    def accept(self, header):
+        """
+        :param header: Raw `Accept` header value.
+
+        :returns: The preferred acceptable MIME, the first registered if
+            `header` is empty or `None` if none are acceptable.
+        """
+        mime = self.accepts.get(header, pilo.NOT_SET)
+        if mime is pilo.NOT_SET:
+            mime = self._accept(header)
+            self.accepts.set(header, mime)
+        return mime
+
+    def _accept(self, header):
+        if not header:
+            return self.mimes[0] if self.mimes else None
+        accept = werkzeug.http.parse_accept_header(
+            header, werkzeug.datastructures.MIMEAccept
+        )
+        accept_type = accept.best_match(
+            [mime.accept_type for mime in self.mimes]
+        )
+        for mime in self.mimes:
+            if mime.accept_type == accept_type:
+                return mime
+
+    def content(self, content_type):
+        """
+        :returns: MIME able to source `content_type` or `None`.
+        """
+        for mime in self.mimes:
+            if mime.content_type == content_type and mime.source is not None:
+                return mime
 
 
-class JSONEncoder(json.JSONEncoder):
+# json
 
-    def __init__(self, indent=4, sort_keys=True, errors='strict'):
-        super(JSONEncoder, self).__init__(indent=indent, sort_keys=sort_keys)
+JSON_BACKENDS = ['simplejson', 'json']
+
+
+def json_backends(names=None):
+    """
+    Imports available `json` compatible modules, in order of preference.
+    `simplejson` is preferred because its C speedups also cover indented and
+    key sorted encoding.
+    """
+    backends = []
+    for name in names or JSON_BACKENDS:
+        try:
+            backends.append(importlib.import_module(name))
+        except ImportError:
+            pass
+    return backends
+
+
+json_backend = json_backends()[0]
+
+
+def json_loads(text, encoding=None, backend=None):
+    """
+    Decodes using `backend` (defaults to `json_backend`) with the output of
+    the stdlib `json`, i.e. strings are always `unicode`. Given `str` text
+    `simplejson` decodes ASCII only strings as `str`, so text is decoded
+    first.
+    """
+    if isinstance(text, str):
+        text = text.decode(encoding or 'utf-8')
+    return (backend or json_backend).loads(text)
+
+
+class JSONSource(pilo.source.JsonSource):
+
+    backend = json_backend
+
+    def __init__(self, text, encoding=None, strict=False, location=None):
+        # NOTE: pilo.source.JsonSource.__init__ hard codes stdlib json.loads
+        pilo.source.Source.__init__(self)
+        self.strict = strict
+        self.location = location
+        self.text = text
+        self.data = json_loads(text, encoding, self.backend)
+
+
+_no_key = object()
+
+_json_key_types = (bool, int, long, float, type(None))
+
+
+class JSONEncoder(object):
+    """
+    Encodes using `backend` (defaults to `json_backend`) with the output of
+    the stdlib `json`. Compact by default, which also keeps the stdlib
+    eligible for its C accelerated encoder (bypassed if `indent` or
+    `sort_keys` is set).
+    """
+
+    def __init__(self,
+                 indent=None,
+                 sort_keys=False,
+                 separators=(',', ':'),
+                 errors='strict',
+                 backend=None):
+        self.backend = backend or json_backend
+        kwargs = dict(
+            indent=indent,
+            sort_keys=sort_keys,
+            separators=separators,
+            default=self.default,
+        )
+        if self.backend.__name__ == 'simplejson':
+            # stdlib semantics
+            kwargs.update(use_decimal=False, namedtuple_as_object=False)
+        self.encoder = self.backend.JSONEncoder(**kwargs)
         self.errors = errors
 
+    def encode(self, o):
+        return self.encoder.encode(o)
+
+    def iterencode(self, o):
+        """
+        Encodes `o` as chunks of text. Iterators (e.g. a generator of
+        `Resource`s) are encoded as arrays an item at a time, so an item is
+        only produced and encoded when its chunk is consumed. Everything not
+        containing an iterator is encoded in one shot. Joined chunks equal
+        `encode` of the same value with iterators as lists.
+        """
+        return self._iterencode(o, 0)
+
+    @classmethod
+    def _streams(cls, o):
+        if isinstance(o, collections.Iterator):
+            return True
+        if type(o) is dict:
+            return any(cls._streams(value) for value in o.itervalues())
+        if type(o) in (list, tuple):
+            return any(cls._streams(value) for value in o)
+        return False
+
+    def _newline(self, level):
+        indent = self.encoder.indent
+        if not isinstance(indent, basestring):
+            indent = ' ' * indent
+        return '\n' + indent * level
+
+    def _iterencode(self, o, level):
+        if not self._streams(o):
+            text = self.encode(o)
+            if self.encoder.indent is not None and level:
+                text = text.replace('\n', self._newline(level))
+            return [text]
+        if type(o) is dict:
+            members = o.iteritems()
+            if self.encoder.sort_keys:
+                members = sorted(members)
+            return self._iterencode_container('{', members, '}', level)
+        items = ((_no_key, item) for item in o)
+        return self._iterencode_container('[', items, ']', level)
+
+    def _iterencode_container(self, start, members, end, level):
+        item_separator = self.encoder.item_separator
+        if self.encoder.indent is not None:
+            newline = self._newline(level + 1)
+            item_separator += newline
+        else:
+            newline = ''
+        prefix = start + newline
+        empty = True
+        for key, value in members:
+            if not empty:
+                prefix = item_separator
+            empty = False
+            if key is not _no_key:
+                prefix += self._key(key) + self.encoder.key_separator
+            for chunk in self._iterencode(value, level + 1):
+                yield prefix + chunk
+                prefix = ''
+        if empty:
+            yield start + end
+        elif self.encoder.indent is not None:
+            yield self._newline(level) + end
+        else:
+            yield end
+
+    def _key(self, key):
+        # keys are coerced as the stdlib does, e.g. True to "true"
+        if not isinstance(key, basestring):
+            if not isinstance(key, _json_key_types):
+                raise TypeError('key ' + repr(key) + ' is not a string')
+            key = self.encode(key)
+        return self.encode(key)
+
     def default(self, o):
         if isinstance(o, datetime.datetime):
             return self._datetime(o)
@@ -59,13 +267,87 @@ class JSONEncoder(json.JSONEncoder):
         return str(o.hex)
 
 
+json_encoder = JSONEncoder()
+
 json = MIME(
     accept_type='application/json',
     source=JSONSource,
     content_type='application/json',
-    encode=JSONEncoder().encode,
+    encode=json_encoder.encode,
+    stream=json_encoder.iterencode,
 )
 
+pretty_json_encoder = JSONEncoder(
+    indent=4, sort_keys=True, separators=(', ', ': '),
+)
+
+pretty_json = MIME(
+    accept_type='application/json',
+    source=JSONSource,
+    content_type='application/json',
+    encode=pretty_json_encoder.encode,
+    stream=pretty_json_encoder.iterencode,
+)
+
+
+# msgpack
+
+class MessagePackSource(pilo.source.JsonSource):
+    """
+    Unpacked values are the same types as decoded JSON values, so parsing is
+    that of `pilo.source.JsonSource`.
+    """
+
+    def __init__(self, text, encoding=None, strict=False, location=None):
+        pilo.source.Source.__init__(self)
+        self.strict = strict
+        self.location = location
+        self.text = text
+        self.data = msgpack_backend.unpackb(text, raw=False)
+
+
+class MessagePackEncoder(object):
+    """
+    Packs what `JSONEncoder` encodes, converting values (e.g. datetimes) the
+    same way so either is mapped back the same. Iterators are packed as
+    arrays.
+    """
+
+    def __init__(self, errors='strict'):
+        self.errors = errors
+        self._default = JSONEncoder(errors=errors).default
+
+    def encode(self, o):
+        # py2 str is text, as it is to JSONEncoder
+        return msgpack_backend.packb(
+            o, default=self.default, use_bin_type=False,
+        )
+
+    def iterencode(self, o):
+        # array lengths are packed up front so there is no streaming them
+        yield self.encode(o)
+
+    def default(self, o):
+        if isinstance(o, collections.Iterator):
+            return list(o)
+        return self._default(o)
+
+
+msgpack_encoder = MessagePackEncoder()
+
+msgpack = MIME(
+    accept_type='application/msgpack',
+    source=MessagePackSource,
+    content_type='application/msgpack',
+    encode=msgpack_encoder.encode,
+    stream=msgpack_encoder.iterencode,
+)
+
+
+# internal, i.e. cached values and messages
+
+internal = msgpack if msgpack_backend is not None else json
+
 
 # url
 
@@ -126,4 +408,11 @@ url = MIME(
     source=None,
     content_type='application/x-www-form-urlencoded',
     encode=URLEncoder().encode,
+    stream=None,
 )
+
+
+registry = Registry(json)
+
+if msgpack_backend is not None:
+    registry.register(msgpack)
@@ -107,18 +107,50 @@ class DBEnum(list):
 cache_cli = None
 
 
+class UTCDatetime(pilo.fields.Datetime):
+    """
+    Naive UTC datetime, like what the db columns hold, parsed from iso8601.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('format', 'iso8601')
+        super(UTCDatetime, self).__init__(*args, **kwargs)
+
+    def _parse(self, path):
+        value = super(UTCDatetime, self)._parse(path)
+        if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+            value = (value - value.utcoffset()).replace(tzinfo=None)
+        return value
+
+
 class CacheStringModel(pilo.Form):
 
-    mime = mimes.json
+    mime = mimes.internal
 
     @classmethod
-    def get(cls, key):
-        value = cache_cli.get(key)
+    def _load(cls, value):
         if value is None:
             return
-        source = cls.mime.source(value)
-        obj = cls(source)
-        return obj
+        try:
+            source = cls.mime.source(value)
+        except (ValueError, TypeError) as ex:
+            # e.g. written in another mime, treat as a miss
+            logger.warning(
+                '%s.mime cannot source cached value\n%r%s',
+                cls.__name__, value, ex,
+            )
+            return
+        return cls(source)
+
+    @classmethod
+    def get(cls, key):
+        return cls._load(cache_cli.get(key))
+
+    @classmethod
+    def get_many(cls, keys):
+        if not keys:
+            return []
+        return [cls._load(value) for value in cache_cli.mget(keys)]
 
     @classmethod
     def delete(cls, key):
@@ -135,9 +167,9 @@ class CacheStringModel(pilo.Form):
     def save(self):
         value = type(self).mime.encode(self)
         if self.ttl:
-            cache_cli.setex(value, ttl=self.ttl)
+            cache_cli.setex(self.key, value, self.ttl)
         else:
-            cache_cli.set(value)
+            cache_cli.set(self.key, value)
         return self
 
 
@@ -189,7 +221,7 @@ class CacheHashModel(pilo.Form):
 
 class MessageModel(pilo.Form):
 
-    mime = mimes.json
+    mime = mimes.internal
 
     _type_ = pilo.fields.Type.abstract()
 
@@ -316,6 +348,36 @@ class TransactionalMessageQ(MessageQ):
 txnq = TransactionalMessageQ().monitor()
 
 
+class Written(collections.namedtuple('Written', ['entity', 'id'])):
+    """
+    Notice that an entity was written, passed to `listeners` once published
+    (e.g. by `txnq` when the transaction writing it commits).
+    """
+
+    listeners = []
+
+    @classmethod
+    def monitor(cls, entity_cls):
+
+        def _publish(mapper, cxn, entity):
+            cls.create(entity).publish(txnq)
+
+        for event in ['after_insert', 'after_update', 'after_delete']:
+            saevent.listen(entity_cls, event, _publish, propagate=True)
+
+    @classmethod
+    def create(cls, entity):
+        # read now, entity is expired once committed
+        return cls(entity=entity, id=entity.id)
+
+    def publish(self, q=None):
+        if q is not None:
+            q.append(self)
+            return
+        for listener in self.listeners:
+            listener(self.entity, id=self.id)
+
+
 # domain
 
 class Words(list):
@@ -451,9 +513,9 @@ class User(DBModel):
 
         id = pilo.fields.UUID()
 
-        created_at = pilo.fields.Datetime(format='iso8601')
+        created_at = UTCDatetime()
 
-        updated_at = pilo.fields.Datetime(format='iso8601')
+        updated_at = UTCDatetime()
 
         email_address = pilo.fields.String()
 
@@ -463,6 +525,12 @@ class User(DBModel):
         def get(cls, id):
             return super(User.Cached, cls).get(cls.calculate_key(id))
 
+        @classmethod
+        def get_many(cls, ids):
+            return super(User.Cached, cls).get_many(
+                [cls.calculate_key(id) for id in ids]
+            )
+
         @classmethod
         def delete(cls, id):
             return super(User.Cached, cls).delete(cls.calculate_key(id))
@@ -478,6 +546,7 @@ class User(DBModel):
 
 
 Change.monitor(User)
+Written.monitor(User)
 
 
 class Password(DBModel):
@@ -652,13 +721,17 @@ class Prisoner(DBModel):
 
         id = pilo.fields.UUID()
 
-        created_at = pilo.fields.Datetime(format='iso8601')
+        created_at = UTCDatetime()
+
+        updated_at = UTCDatetime()
 
-        updated_at = pilo.fields.Datetime(format='iso8601')
+        expires_at = UTCDatetime()
 
-        expires_at = pilo.fields.Datetime(format='iso8601')
+        terminated_at = UTCDatetime(nullable=True, default=None)
+
+        user_id = pilo.fields.UUID()
 
-        termianted_at = pilo.fields.Datetime(format='iso8601', default=None)
+        state = pilo.fields.String(choices=DBEnum(PrisonerState))
 
         secret = pilo.fields.String()
 
@@ -672,6 +745,12 @@ class Prisoner(DBModel):
         def get(cls, id):
             return super(Prisoner.Cached, cls).get(cls.calculate_key(id))
 
+        @classmethod
+        def get_many(cls, ids):
+            return super(Prisoner.Cached, cls).get_many(
+                [cls.calculate_key(id) for id in ids]
+            )
+
         @classmethod
         def delete(cls, id):
             return super(Prisoner.Cached, cls).delete(cls.calculate_key(id))
@@ -799,6 +878,9 @@ class Prisoner(DBModel):
             .filter(Prisoner.id == self.id, *filters)
             .update(values=values, synchronize_session='fetch')
         )
+        if count == 1:
+            # bulk updates bypass mapper events
+            Written.create(self).publish(txnq)
         if count == 1 and 'state' in values:
             self.Transition(
                 user_id=self.user.id,
@@ -809,6 +891,7 @@ class Prisoner(DBModel):
 
 
 Change.monitor(Prisoner)
+Written.monitor(Prisoner)
 
 class Stats(CacheHashModel):
 
@@ -24,6 +24,10 @@ setuptools.setup(
         'Flask >=0.10.1,<0.11',
         'flask-hype >=0.1,<0.2',
     ],
+    extras_require={
+        'speedups': ['simplejson >=3.0'],
+        'msgpack': ['msgpack >=0.5.2'],
+    },
     packages=setuptools.find_packages('.', exclude=('tests', 'tests.*')),
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -75,23 +75,38 @@ __version__ = '0.1.4'
 __all__ = [
     'Id',
     'id_field',
+    'is_lazy',
+    'LRU',
+    'memoize',
     'Link',
     'ResolvedLink',
     'Binding',
+    'Breaker',
+    'NegativeCache',
     'Resource',
     'Registry',
 ]
 
+import bisect
 import codecs
 import collections
+import datetime
 import functools
+import hashlib
 import inspect
 import itertools
 import logging
+import multiprocessing.pool
+import Queue
+import sys
+import threading
+import time
+import weakref
 
 import flask
 import pilo
 import werkzeug.routing
+import werkzeug.urls
 
 
 logger = logging.getLogger(__name__)
@@ -115,6 +130,25 @@ class Id(pilo.fields.String):
 
             id = hype.Id('guid', IdCodec(prefix='munch=', encoding='hex'))
 
+    and `cache` to memoize conversions of hot ids in a bounded `LRU` per
+    direction:
+
+    .. code:: python
+
+        class MyResource(Resource):
+
+            id = hype.Id('guid', IdCodec(prefix='munch='), cache=1024)
+
+        MyResource.id.cache_info()
+
+    An `Id` referencing another `Resource` shares that resource's `Id` codec
+    and, unless given its own, its cache.
+
+    Codecs may also implement `match(input)`, a cheap check (e.g. prefix,
+    alphabet and length) that `is_encoded` uses to reject `input` without
+    attempting a decode. It must never reject what would decode. And
+    `encode_many(inputs)`, which `encode_many` uses to encode in bulk.
+
     `Link`s (i.e. URIs) are the canonical way to reference a `Resource`.
     """
 
@@ -139,8 +173,17 @@ class Id(pilo.fields.String):
         else:
             self._codec = self.Identity()
 
+        # cache
+        cache = kwargs.pop('cache', None)
+        if cache is not None:
+            self._encoded, self._decoded = LRU(cache), LRU(cache)
+        else:
+            self._encoded = self._decoded = None
+
         super(Id, self).__init__(*args, **kwargs)
 
+    CacheInfo = collections.namedtuple('CacheInfo', ['encode', 'decode'])
+
     class Identity(codecs.Codec):
 
         def encode(self, input, errors='strict'):
@@ -149,6 +192,9 @@ class Id(pilo.fields.String):
         def decode(self, input, errors='strict'):
             return input
 
+        def match(self, input):
+            return True
+
     @property
     def codec(self):
         if isinstance(self._codec, codecs.Codec):
@@ -181,25 +227,103 @@ class Id(pilo.fields.String):
         if not field:
             raise Exception('{0} has no Id field'.format(resource_cls.__name__))
         self._codec = field.codec
+        if self._encoded is None:
+            self._encoded, self._decoded = field._encoded, field._decoded
 
         return self._codec
 
+    def cache_info(self):
+        """
+        :returns: `Id.CacheInfo` of `LRU.Info` for the encode and decode
+            caches or `None` if not caching.
+        """
+        self.codec
+        if self._encoded is None:
+            return None
+        return self.CacheInfo(self._encoded.info(), self._decoded.info())
+
+    def cache_clear(self):
+        self.codec
+        if self._encoded is not None:
+            self._encoded.clear()
+            self._decoded.clear()
+
     def encode(self, obj):
-        return self.codec.encode(obj)
+        codec = self.codec
+        if self._encoded is None:
+            return codec.encode(obj)
+        try:
+            value = self._encoded.get(obj, pilo.NOT_SET)
+        except TypeError:  # unhashable
+            return codec.encode(obj)
+        if value is pilo.NOT_SET:
+            value = codec.encode(obj)
+            self._encoded.set(obj, value)
+            # only canonical encodings are safe to map back
+            self._decoded.set(value, obj)
+        return value
+
+    def encode_many(self, objs):
+        """
+        Encodes each of `objs`, those not cached in one call to the codec's
+        `encode_many` if it has one.
+
+        :param objs: List of ids to encode.
+
+        :returns: List of encoded ids in the same order as `objs`.
+        """
+        codec = self.codec
+        encode_many = getattr(codec, 'encode_many', None)
+        if encode_many is None:
+            encode_many = lambda objs: [codec.encode(obj) for obj in objs]
+        if self._encoded is None:
+            return list(encode_many(objs))
+        values, misses = [], []
+        for i, obj in enumerate(objs):
+            try:
+                value = self._encoded.get(obj, pilo.NOT_SET)
+            except TypeError:  # unhashable
+                value = pilo.NOT_SET
+            if value is pilo.NOT_SET:
+                misses.append(i)
+            values.append(value)
+        if misses:
+            encoded = encode_many([objs[i] for i in misses])
+            for i, value in itertools.izip(misses, encoded):
+                values[i] = value
+                try:
+                    self._encoded.set(objs[i], value)
+                except TypeError:  # unhashable
+                    continue
+                self._decoded.set(value, objs[i])
+        return values
 
     def decode(self, obj):
-        return self.codec.decode(obj)
+        codec = self.codec
+        if self._decoded is None:
+            return codec.decode(obj)
+        try:
+            value = self._decoded.get(obj, pilo.NOT_SET)
+        except TypeError:  # unhashable
+            return codec.decode(obj)
+        if value is pilo.NOT_SET:
+            value = codec.decode(obj)
+            self._decoded.set(obj, value)
+        return value
 
     def is_encoded(self, obj):
+        match = getattr(self.codec, 'match', None)
+        if match is not None and not match(obj):
+            return False
         try:
-            self.codec.decode(obj)
+            self.decode(obj)
             return True
         except (TypeError, ValueError):
             return False
 
     def is_decoded(self, obj):
         try:
-            self.codec.encode(obj)
+            self.encode(obj)
             return True
         except (TypeError, ValueError):
             return False
@@ -229,26 +353,170 @@ class DecodedId(pilo.Field):
         return id_field(resource_cls).decode(path.value)
 
 
-# https://wiki.python.org/moin/PythonDecoratorLibrary#Alternate_memoize_as_nested_functions
-def memoize(func):
+class LRU(object):
+    """
+    Size bounded, thread-safe, least recently used cache:
+
+    .. code:: python
+
+        cache = hype.LRU(maxsize=2)
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('b', None) is None
+        assert cache.info() == (1, 1, 2, 1)
+        cache.clear()
+
+    `maxsize`
+        Maximum number of entries to hold before evicting the least recently
+        used. `None` means unbounded. Defaults to 128.
+
+    `weak`
+        Flag indicating whether classes in keys (i.e. the key itself or members
+        of a tuple key) should be weakly referenced. If so entries are evicted
+        once any class they reference is collected. Defaults to `False`.
+
+    """
+
+    Info = collections.namedtuple('Info', [
+        'hits', 'misses', 'maxsize', 'currsize',
+    ])
+
+    def __init__(self, maxsize=128, weak=False):
+        self.maxsize = maxsize
+        self.weak = weak
+        self.hits = 0
+        self.misses = 0
+        self.entries = collections.OrderedDict()
+        self.dead = []
+        self.lock = threading.RLock()
+
+    def _key(self, key):
+        if not self.weak:
+            return key
+        if inspect.isclass(key):
+            return weakref.ref(key, self.dead.append)
+        if isinstance(key, tuple):
+            return tuple(self._key(part) for part in key)
+        return key
+
+    def _refers(self, key, ref):
+        if isinstance(key, tuple):
+            return any(self._refers(part, ref) for part in key)
+        return key is ref
+
+    def _purge(self):
+        while self.dead:
+            ref = self.dead.pop()
+            for key in [k for k in self.entries if self._refers(k, ref)]:
+                del self.entries[key]
+
+    def get(self, key, default=None):
+        """
+        Looks up a cached value, marking it as most recently used.
+
+        :param key: Hashable key.
+        :param default: What to return if `key` is not cached.
+
+        :returns: The cached value or `default`.
+        """
+        key = self._key(key)
+        with self.lock:
+            self._purge()
+            try:
+                value = self.entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Caches a value, evicting the least recently used if full.
+
+        :param key: Hashable key.
+        :param value: The value to cache.
+        """
+        key = self._key(key)
+        with self.lock:
+            self._purge()
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            while self.maxsize is not None and len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        """
+        Drops a cached value if present.
+        """
+        key = self._key(key)
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drops all cached values and resets hit/miss counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            del self.dead[:]
+            self.hits = self.misses = 0
+
+    def info(self):
+        """
+        :returns: `LRU.Info` of hits, misses, maxsize and currsize.
+        """
+        with self.lock:
+            return self.Info(
+                self.hits, self.misses, self.maxsize, len(self.entries),
+            )
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def memoize(func=None, maxsize=128, weak=True):
+    """
+    Decorator caching a function's results by its arguments in a `LRU`:
+
+    .. code:: python
+
+        @hype.memoize(maxsize=64)
+        def lookup(resource_cls, name):
+            ...
+
+        lookup.cache_info()
+        lookup.cache_clear()
+
+    Classes passed as arguments are weakly referenced unless `weak` is `False`.
+    Calls with unhashable arguments are not cached. Use `Registry.memoize` for
+    functions depending on what is registered.
+    """
+    if func is None:
+        return functools.partial(memoize, maxsize=maxsize, weak=weak)
 
-    cache = {}
+    cache = LRU(maxsize=maxsize, weak=weak)
 
     @functools.wraps(func)
     def memoizer(*args, **kwargs):
-        key = (args, tuple(kwargs.iteritems()))
-        if not isinstance(key, collections.Hashable):
+        key = (args, tuple(sorted(kwargs.iteritems())))
+        try:
+            hash(key)
+        except TypeError:
             return func(*args, **kwargs)
-        if key in cache:
-            return cache[key]
-        result = func(*args, **kwargs)
-        cache[key] = result
+        result = cache.get(key, pilo.NOT_SET)
+        if result is pilo.NOT_SET:
+            result = func(*args, **kwargs)
+            cache.set(key, result)
         return result
 
+    memoizer.cache = cache
+    memoizer.cache_info = cache.info
+    memoizer.cache_clear = cache.clear
     return memoizer
 
 
-@memoize
 def id_field(obj, default=pilo.NOT_SET):
     """
     Locates and returns the `Id` field associated with either a:
@@ -262,19 +530,165 @@ def id_field(obj, default=pilo.NOT_SET):
     :returns: The `Id` field.
     """
     if not inspect.isclass(obj):
-        if not isinstance(type(obj), Resource):
+        if not isinstance(obj, Resource):
             raise TypeError(
                 '{0} not a {1} subclass or instance'.format(obj, Resource)
             )
         obj = type(obj)
     if not issubclass(obj, Resource):
         raise TypeError('{0} not a {1} subclass'.format(obj, Resource))
-    for field in obj.fields:
-        if isinstance(field, Id):
-            return field
-    if default is pilo.NOT_SET:
-        raise ValueError('{0} has not Id field'.format(obj))
-    return default
+    if obj._id_field is None:
+        if default is pilo.NOT_SET:
+            raise ValueError('{0} has not Id field'.format(obj))
+        return default
+    return obj._id_field
+
+
+def is_lazy(resource):
+    """
+    Whether any fields of a lazy `Resource` instance are still to be mapped.
+
+    :param resource: A `Resource` instance.
+
+    :returns: True if some are, otherwise False.
+    """
+    return bool(resource._lazy_names)
+
+
+class URLBuilder(object):
+    """
+    Compiled form of a `werkzeug.routing.Rule` used by `Link` to build paths
+    for a fixed set of parameter names. The rule's path is pre-split into
+    static (already quoted) strings and converter `to_url` callables so
+    building is just a join:
+
+    .. code:: python
+
+        builder = URLBuilder(rule, ['user'])
+        assert builder({'user': 'us-123'}) == '/users/us-123'
+
+    Rules whose domain part is dynamic (or which do not expose what is needed
+    to compile them, i.e. the private ``_trace`` and ``_converters`` of the
+    Werkzeug versions pinned by setup.py, in the shape they have there) are
+    built by `werkzeug.routing.Rule.build` instead. Converters rejecting a value (i.e.
+    raising `werkzeug.routing.ValidationError` or `ValueError`) make the rule
+    unsuitable.
+    """
+
+    @classmethod
+    def suitable_for(cls, rule, names, method=None):
+        """
+        Like `werkzeug.routing.Rule.suitable_for` but only considering
+        parameter names, defaults are checked by the builder itself.
+        """
+        if (method is not None and
+            rule.methods is not None and
+            method not in rule.methods):
+            return False
+        defaults = rule.defaults or ()
+        for key in rule.arguments:
+            if key not in defaults and key not in names:
+                return False
+        return True
+
+    def __init__(self, rule, names, append_unknown=True):
+        self.rule = rule
+        self.append_unknown = append_unknown
+        defaults = rule.defaults or {}
+        self.checks = [
+            (name, value) for name, value in defaults.iteritems()
+            if name in names
+        ]
+        self.unknown = [name for name in names if name not in rule.arguments]
+        self.parts = self._compile(rule, defaults)
+
+    @staticmethod
+    def compiled(rules):
+        """
+        Pairs `rules` with their compiled state, which is replaced when a rule
+        is re-compiled (e.g. rebound to a map), for comparison by identity.
+        """
+        return [(rule, getattr(rule, '_trace', None)) for rule in rules]
+
+    def _compile(self, rule, defaults):
+        trace = getattr(rule, '_trace', None)
+        converters = getattr(rule, '_converters', None)
+        if not self._compilable(trace, converters):
+            logger.debug('building %s with Rule.build', rule)
+            return None
+        charset = rule.map.charset
+        parts, in_domain = [], True
+        for is_dynamic, data in trace:
+            if in_domain:
+                if is_dynamic:
+                    return None
+                if data == '|':
+                    in_domain = False
+                continue
+            if is_dynamic and data not in defaults:
+                parts.append((converters[data].to_url, data))
+                continue
+            if is_dynamic:
+                data = converters[data].to_url(defaults[data])
+            else:
+                data = werkzeug.urls.url_quote(data, charset, safe='/:|+')
+            if parts and parts[-1][0] is None:
+                parts[-1] = (None, parts[-1][1] + data)
+            else:
+                parts.append((None, data))
+        return parts
+
+    @staticmethod
+    def _compilable(trace, converters):
+        if not isinstance(trace, list) or not isinstance(converters, dict):
+            return False
+        separated = False
+        for part in trace:
+            if not isinstance(part, tuple) or len(part) != 2:
+                return False
+            is_dynamic, data = part
+            if (not isinstance(is_dynamic, bool) or
+                not isinstance(data, basestring)):
+                return False
+            if is_dynamic:
+                if not callable(getattr(converters.get(data), 'to_url', None)):
+                    return False
+            elif data == '|':
+                separated = True
+        return separated
+
+    def __call__(self, values):
+        """
+        Builds a path from `values`.
+
+        :param values: Mapping of parameter name to value.
+
+        :returns: The path or None if `values` are not suitable for the rule.
+        """
+        for name, value in self.checks:
+            if values[name] != value:
+                return None
+        try:
+            if self.parts is None:
+                rv = self.rule.build(values, self.append_unknown)
+                return None if rv is None else rv[1]
+            path = ''.join(
+                data if to_url is None else to_url(values[data])
+                for to_url, data in self.parts
+            )
+        except (werkzeug.routing.ValidationError, ValueError):
+            return None
+        if self.append_unknown and self.unknown:
+            url_map = self.rule.map
+            query = werkzeug.urls.url_encode(
+                dict((name, values[name]) for name in self.unknown),
+                charset=url_map.charset,
+                sort=url_map.sort_parameters,
+                key=url_map.sort_key,
+            )
+            if query:
+                path = '{0}?{1}'.format(path, query)
+        return path
 
 
 class Link(pilo.fields.String):
@@ -305,6 +719,9 @@ class Link(pilo.fields.String):
             def _url_map(self):
                 return return flask_app.url_map
 
+    Paths built while the ``link_urls`` context variable is set (e.g. by
+    `Resource.render_many`) are memoized in it by parameter values, so links
+    shared by many resources (e.g. to a common parent) are built once.
     """
 
     def __init__(self, endpoint, **kwargs):
@@ -319,22 +736,48 @@ class Link(pilo.fields.String):
             if not isinstance(v, (basestring, pilo.Field)):
                 raise ValueError('{0}= type {1} invalid'.format(k, type(v)))
         self.params = kwargs
+        self._params = [
+            (name, value if isinstance(value, pilo.Field) else value.split('.'))
+            for name, value in kwargs.iteritems()
+        ]
         super(Link, self).__init__(**reserved)
 
+    #: `URLBuilder`s compiled per url map, see `Link._builders`.
+    builders = weakref.WeakKeyDictionary()
+
     def _url_map(self):
         if flask.has_app_context():
             return flask.current_app.url_map
 
+    def _builders(self, url_map, names):
+        try:
+            rules = list(url_map.iter_rules(self.endpoint))
+        except KeyError:  # unknown endpoint
+            rules = []
+        compiled = URLBuilder.compiled(rules)
+        ids = [(id(rule), id(trace)) for rule, trace in compiled]
+        cached = self.builders.get(url_map)
+        if cached is None:
+            cached = self.builders[url_map] = {}
+        key = (self.endpoint, self.method, self.append_unknown, names)
+        entry = cached.get(key)
+        if entry is None or entry[0] != ids:
+            # holds on to compiled so its ids are not reused while cached
+            entry = cached[key] = (ids, compiled, [
+                URLBuilder(rule, names, self.append_unknown)
+                for rule in rules
+                if URLBuilder.suitable_for(rule, names, self.method)
+            ])
+        return entry[2]
+
     def _url_for(self, **values):
         url_map = self._url_map()
         if url_map is None:
             raise Exception('{0}._url_map() = None'.format(type(self)))
-        for rule in url_map.iter_rules(self.endpoint):
-            if rule.suitable_for(values, self.method):
-                rv = rule.build(values, self.append_unknown)
-                if rv is not None:
-                    _, path = rv
-                    return path
+        for builder in self._builders(url_map, frozenset(values)):
+            path = builder(values)
+            if path is not None:
+                return path
         raise werkzeug.routing.BuildError(self.endpoint, values, self.method)
 
     # pilo.fields.String
@@ -342,17 +785,27 @@ class Link(pilo.fields.String):
     def _compute(self):
         values = {}
         try:
-            for name, field in self.params.iteritems():
+            for name, field in self._params:
                 if isinstance(field, pilo.Field):
                     value = field.__get__(self.ctx.form)
                 else:
-                    value = reduce(getattr, field.split('.'), self.ctx.form)
+                    value = reduce(getattr, field, self.ctx.form)
                 if value in (None, pilo.IGNORE):
                     return pilo.NONE
                 values[name] = value
         except (AttributeError, pilo.Missing):
             return pilo.NONE
-        return self._url_for(**values)
+        urls = getattr(self.ctx, 'link_urls', None)
+        if urls is None:
+            return self._url_for(**values)
+        try:
+            key = (self, frozenset(values.iteritems()))
+            url = urls.get(key)
+        except TypeError:  # unhashable
+            return self._url_for(**values)
+        if url is None:
+            url = urls[key] = self._url_for(**values)
+        return url
 
 
 class RequestForm(pilo.Form):
@@ -490,7 +943,9 @@ class ResourceConverter(werkzeug.routing.BaseConverter):
             raise werkzeug.routing.ValidationError(
                 '{0} has no Id field'.format(matched_cls, value)
             )
-        obj = matched_cls.get(value)
+        obj = matched_cls.get(
+            value, lazy=self.resource_cls.registry.lazy_converters,
+        )
         if obj is None:
             raise werkzeug.routing.ValidationError(
                 '{0}.get({1}) is None'.format(matched_cls, value)
@@ -530,6 +985,66 @@ class ResourceConverter(werkzeug.routing.BaseConverter):
         return super(ResourceConverter, self).to_url(value)
 
 
+class IdIndex(object):
+    """
+    Index of `Resource` subclasses by `Id` field codec used by
+    `Registry.match_id`. Codecs exposing a `prefix` (e.g. "us-") are placed in
+    a character trie keyed on that prefix so resolving an encoded id only
+    considers resources whose prefix it starts with:
+
+    .. code:: python
+
+        index = IdIndex(registry)
+        assert list(index.candidates('us-2Jq8ke')) == [User]
+
+    Codecs without a `prefix` go into a fallback bucket which is always
+    considered last. You typically never build these, `Registry` does it for
+    you and drops it whenever a resource is added or discarded.
+    """
+
+    #: Trie node key holding the resources for the prefix ending at that node.
+    leaf = None
+
+    def __init__(self, registry):
+        self.trie = {}
+        self.fallback = []
+        order = lambda cls: (len(inspect.getmro(cls)), registry.order(cls))
+        for resource_cls in sorted(registry, key=order):
+            field = id_field(resource_cls, default=None)
+            if field is None:
+                continue
+            prefix = getattr(field.codec, 'prefix', None)
+            if not prefix:
+                self.fallback.append(resource_cls)
+                continue
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(self.leaf, []).append(resource_cls)
+
+    def candidates(self, id):
+        """
+        Resource types whose `Id` field *might* be able to decode `id`, most
+        specific (i.e. longest) prefix first.
+
+        :param id: An encoded id.
+
+        :returns: Iterable of `Resource` subclasses.
+        """
+        buckets = []
+        if isinstance(id, basestring):
+            node = self.trie
+            for char in id:
+                node = node.get(char)
+                if node is None:
+                    break
+                if self.leaf in node:
+                    buckets.append(node[self.leaf])
+        buckets.reverse()
+        buckets.append(self.fallback)
+        return itertools.chain.from_iterable(buckets)
+
+
 class Registry(collections.MutableSet):
     """
     Set containing all your `Resource`s. When building out your resource layer
@@ -546,23 +1061,320 @@ class Registry(collections.MutableSet):
 
     and that's it.
 
+    Pass `identity_map=True` to have `Resource.get` and `Registry.adapt` share
+    resource instances, keyed on (resource type, decoded id), for the duration
+    of a request. Each model is then fetched from its bindings at most once per
+    request. `adapt` only shares a resource adapting the very same model
+    object, a different one with the same id replaces it. Code mutating models
+    should `Resource.refresh` afterwards.
+
+    Pass `lazy_converters=True` to have `ResourceConverter`s get lazy
+    resources (see `Resource`), so e.g. a conditional request only maps what
+    its `Resource.etag` needs.
+
     """
-    def __init__(self, app):
+    def __init__(self,
+                 app,
+                 identity_map=False,
+                 hedge_workers=8,
+                 lazy_converters=False):
         self.app = app
         self.resource_clses = set()
         self.resource_cls = None
+        self.identity_map = identity_map
+        self.lazy_converters = lazy_converters
+        self.hedge_workers = hedge_workers
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        self._order = {}
+        self._added = itertools.count(0)
+        self._id_index = None
+        self._obj_matches = LRU(maxsize=1024, weak=True)
+        self._memoized = weakref.WeakSet()
+        self._writes = collections.OrderedDict()
+        self._writes_seq = 0
+        self._writes_floor = 0
+        self._writes_lock = threading.Lock()
+        self._hedge_pool = None
+        self._hedge_pool_lock = threading.Lock()
+
+    @property
+    def hedge_pool(self):
+        """
+        Pool of `hedge_workers` threads used for hedged binding calls (see
+        `Resource.bind`), created on demand.
+        """
+        if self._hedge_pool is None:
+            with self._hedge_pool_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = multiprocessing.pool.ThreadPool(
+                        self.hedge_workers
+                    )
+        return self._hedge_pool
+
+    def invalidate(self):
+        """
+        Drops everything this registry has derived from its resources and
+        their bindings (e.g. `id_index`) along with the caches of functions it
+        memoized (see `memoize`). Called for you when resources are added or
+        discarded and when bindings are registered.
+        """
+        self._id_index = None
+        self._obj_matches.clear()
+        for memoizer in list(self._memoized):
+            memoizer.cache_clear()
+
+    def memoize(self, func=None, maxsize=128, weak=True):
+        """
+        Like the `memoize` decorator but the cache is also cleared whenever
+        this registry is invalidated, so memoized functions may depend on
+        what is registered in it:
+
+        .. code:: python
+
+            @registry.memoize(maxsize=64)
+            def lookup(resource_cls, name):
+                ...
+
+        """
+        if func is None:
+            return functools.partial(self.memoize, maxsize=maxsize, weak=weak)
+        memoizer = memoize(func, maxsize=maxsize, weak=weak)
+        self._memoized.add(memoizer)
+        return memoizer
+
+    def order(self, resource_cls):
+        """
+        Position in which `resource_cls` was added to this registry.
+        """
+        return self._order.get(resource_cls)
+
+    @property
+    def id_index(self):
+        """
+        `IdIndex` for the resources in this registry, built on demand.
+        """
+        if self._id_index is None:
+            self._id_index = IdIndex(self)
+        return self._id_index
+
+    @property
+    def identities(self):
+        """
+        The request scoped identity map, or None if `identity_map` is off or
+        there is no request context.
+        """
+        if not self.identity_map:
+            return None
+        state = self._request_state()
+        if state is None:
+            return None
+        identities = state.get('identities')
+        if identities is None:
+            identities = state['identities'] = {}
+            # routing converts view args before the request context is pushed
+            view_args = flask.request.view_args or {}
+            for value in view_args.itervalues():
+                if not isinstance(value, Resource) or type(value) not in self:
+                    continue
+                field = id_field(value, None)
+                if field is None:
+                    continue
+                decoded_id = field.decode(field.__get__(value))
+                identities[(type(value), decoded_id)] = value
+        return identities
+
+    def defer(self, func, *args, **kwargs):
+        """
+        Calls `func` once the response to the current request has been sent
+        (i.e. when the WSGI server closes it) or right away if there is no
+        request context. Deferred calls run in an application context but
+        without the request context, which is gone by then. Calls deferred
+        too late to be attached to the response (e.g. by teardown handlers or
+        when handling failed) run on request teardown instead. Errors raised
+        by deferred calls are logged and swallowed.
+        """
+        state = self._request_state()
+        if state is None:
+            return func(*args, **kwargs)
+        deferred = state.setdefault('deferred', [])
+        deferred.append(functools.partial(func, *args, **kwargs))
+
+    def _request_state(self):
+        if not flask.has_request_context():
+            return None
+        request_ctx = flask._request_ctx_stack.top
+        if not hasattr(request_ctx, 'hype'):
+            request_ctx.hype = {}
+        return request_ctx.hype.setdefault(id(self), {})
+
+    def _run_deferred(self, deferred):
+        with self.app.app_context():
+            for func in deferred:
+                try:
+                    func()
+                except Exception:
+                    logger.exception('deferred %s failed', func)
+
+    def _after_request(self, response):
+        state = self._request_state()
+        deferred = state.pop('deferred', None) if state is not None else None
+        if deferred:
+            response.call_on_close(
+                functools.partial(self._run_deferred, deferred)
+            )
+        return response
 
-    def adapt(self, obj, *resource_clses):
+    def _teardown_request(self, ex):
+        request_ctx = flask._request_ctx_stack.top
+        state = getattr(request_ctx, 'hype', {}).pop(id(self), None)
+        if state is None:
+            return
+        self._run_deferred(state.get('deferred', []))
+
+    def adapt(self, obj, *resource_clses, **kwargs):
+        """
+        Adapts a model object to the `Resource` type matching it.
+
+        :param obj: Model object.
+        :param resource_clses: Optional `Resource` types to match against.
+        :param lazy: Whether to map fields when accessed, see `Resource`.
+
+        :returns: The `Resource`.
+        """
+        lazy = kwargs.pop('lazy', False)
         matched_cls = self.match_obj(obj, *resource_clses)
         if matched_cls is None:
             raise TypeError('{0} matches no {1}'.format(obj, self.resource_cls))
-        return matched_cls(obj)
+        identities = self.identities
+        if identities is None:
+            return matched_cls(obj, lazy=lazy)
+        field = id_field(matched_cls, None)
+        if field is None:
+            return matched_cls(obj, lazy=lazy)
+        path = pilo.DefaultSource(obj).path()
+        path.append(field.src)
+        key = (matched_cls, path.value)
+        if key[1] is pilo.NONE:
+            return matched_cls(obj, lazy=lazy)
+        resource = identities.get(key)
+        if resource is None or resource.obj is not obj:
+            # e.g. a fresh copy of the model, which may differ
+            resource = identities[key] = matched_cls(obj, lazy=lazy)
+        return resource
+
+    def render_many(self, objs, *resource_clses, **kwargs):
+        """
+        Renders model objects each as the `Resource` type matching it, like
+        `adapt` but matching once per model type (when bindings adapt by
+        type), see `Resource.render_many`. Rendered resources are not shared
+        through the identity map.
+
+        :param objs: Iterable of model objects.
+        :param resource_clses: Optional `Resource` types to match against.
+        :param fields: Optional sparse fieldset, names unknown to a matched
+            type raise `ValueError`.
+        :param chunk_size: Number of objects rendered at a time.
+
+        :returns: Generator of `Resource`s.
+        """
+        fields = kwargs.pop('fields', None)
+        chunk_size = kwargs.pop('chunk_size', 100)
+        matches = {}
+        for chunk in _chunks(objs, chunk_size):
+            pairs = []
+            for obj in chunk:
+                matched_cls = matches.get(type(obj), pilo.NOT_SET)
+                if matched_cls is pilo.NOT_SET:
+                    consulted = []
+                    matched_cls = self._match_obj(
+                        obj, resource_clses or self, consulted
+                    )
+                    if all(binding.adapts_by_type for binding in consulted):
+                        matches[type(obj)] = matched_cls
+                if matched_cls is None:
+                    raise TypeError(
+                        '{0} matches no {1}'.format(obj, self.resource_cls)
+                    )
+                pairs.append((matched_cls, obj))
+            for resource in _render_many(pairs, fields):
+                yield resource
+
+    def written(self, obj, *resource_clses, **kwargs):
+        """
+        Tells this registry a model object has been created, updated or
+        deleted. Call it once the write is durable (e.g. committed). Bindings
+        of the `Resource` type matching it which come before the one adapting
+        it (e.g. a cache fronting a database) then `Binding.evict` it. Errors
+        raised by evicting are logged and swallowed. Its id is also discarded
+        from the `NegativeCache` of that type and the types it extends.
+        Objects matching no type are ignored.
+
+        Writes are also remembered (the latest `max_writes` of them), so a
+        fill of a model read before it was written is skipped rather than
+        caching a stale copy (see `Resource.bind`).
+
+        :param obj: Model object.
+        :param resource_clses: Optional `Resource` types to match against.
+        :param id: Its *decoded* id, by default read from `obj`.
+        """
+        decoded_id = kwargs.pop('id', None)
+        matched_cls = self.match_obj(obj, *resource_clses)
+        if matched_cls is None:
+            return
+        if decoded_id is None:
+            field = id_field(matched_cls, None)
+            if field is None:
+                return
+            path = pilo.DefaultSource(obj).path()
+            path.append(field.src)
+            decoded_id = path.value
+            if decoded_id in pilo.IGNORE:
+                return
+        resource_clses = [
+            resource_cls for resource_cls in inspect.getmro(matched_cls)
+            if resource_cls in self
+        ]
+        with self._writes_lock:
+            self._writes_seq += 1
+            for resource_cls in resource_clses:
+                key = (resource_cls, decoded_id)
+                self._writes.pop(key, None)
+                self._writes[key] = self._writes_seq
+            while len(self._writes) > self.max_writes:
+                _, seq = self._writes.popitem(last=False)
+                self._writes_floor = max(self._writes_floor, seq)
+        for resource_cls in resource_clses:
+            if resource_cls.negative_cache is None:
+                continue
+            resource_cls.negative_cache.discard(resource_cls, decoded_id)
+        for binding in matched_cls.bindings:
+            if binding.adapts(obj):
+                break
+            try:
+                binding.evict(decoded_id)
+            except Exception:
+                logger.exception('%s evict failed for %s', binding, decoded_id)
+
+    #: How many writes reported to `written` are remembered.
+    max_writes = 4096
+
+    def _writes_mark(self):
+        return self._writes_seq
+
+    def _written_since(self, resource_cls, decoded_id, mark):
+        # a forgotten write may be newer than mark, so assume it is
+        with self._writes_lock:
+            seq = self._writes.get((resource_cls, decoded_id))
+            if seq is None:
+                seq = self._writes_floor
+            return seq > mark
 
     def encode_id(self, obj, *resource_clses):
         matched_cls = self.match_obj(obj, *resource_clses)
         if matched_cls is None:
             raise TypeError('{0} matches no {1}'.format(obj, self.resource_cls))
-        return id_field(matched_cls).__get__(matched_cls(obj))
+        return id_field(matched_cls).__get__(matched_cls(obj, lazy=True))
 
     def decode_id(self, id, *resource_clses):
         matched_cls = self.match_id(id, *resource_clses)
@@ -580,31 +1392,39 @@ class Registry(collections.MutableSet):
         return codecs
 
     def match_obj(self, obj, *resource_clses):
-        resource_clses = resource_clses or self
+        key = (type(obj), resource_clses)
+        matched_cls = self._obj_matches.get(key, pilo.NOT_SET)
+        if matched_cls is not pilo.NOT_SET:
+            return matched_cls
+        consulted = []
+        matched_cls = self._match_obj(obj, resource_clses or self, consulted)
+        if all(binding.adapts_by_type for binding in consulted):
+            self._obj_matches.set(key, matched_cls)
+        return matched_cls
+
+    def _match_obj(self, obj, resource_clses, consulted):
         for cls in resource_clses:
             for binding in cls.bindings:
+                consulted.append(binding)
                 if not binding.adapts(obj):
                     continue
                 if not binding.polymorphic:
                     return cls
-                return self.match_obj(obj, *cls.__subclasses__()) or cls
+                return (
+                    self._match_obj(obj, cls.__subclasses__(), consulted) or
+                    cls
+                )
             if cls.__subclasses__():
-                cls = self.match_obj(obj, *cls.__subclasses__())
+                cls = self._match_obj(obj, cls.__subclasses__(), consulted)
                 if cls is not None:
                     return cls
 
     def match_id(self, id, *resource_clses):
-
-        def _match(clses):
-            for cls in clses:
-                field = id_field(cls, default=None)
-                if field is not None and field.is_encoded(id):
-                    return cls
-                cls = _match(cls.__subclasses__())
-                if cls is not None:
-                    return cls
-
-        return _match(resource_clses or self)
+        for cls in self.id_index.candidates(id):
+            if resource_clses and not issubclass(cls, resource_clses):
+                continue
+            if id_field(cls).is_encoded(id):
+                return cls
 
     def match_name(self, name):
         for cls in self:
@@ -644,11 +1464,16 @@ class Registry(collections.MutableSet):
                 {'resource_cls': value}
             )
 
+        self.invalidate()
+        if value not in self._order:
+            self._order[value] = next(self._added)
         return self.resource_clses.add(value)
 
     def discard(self, value):
         if value.__name__ in self.app.url_map.converters:
             self.app.url_map.converters.pop(value.__name__)
+        self.invalidate()
+        self._order.pop(value, None)
         return self.resource_clses.discard(value)
 
     def __contains__(self, value):
@@ -661,6 +1486,165 @@ class Registry(collections.MutableSet):
         return self.resource_clses.__len__()
 
 
+class NegativeCache(object):
+    """
+    Bounded set of decoded ids recently found missing from *every* binding of
+    a `Resource`, each remembered for `ttl` seconds. Attach one when binding
+    and `Resource.get` answers None for those ids without asking any binding:
+
+    .. code:: python
+
+        Something.bind(
+            Cache(models.CachedOther),
+            DB(models.Other),
+            negative_cache=hype.NegativeCache(ttl=5),
+        )
+
+    Ids are remembered per `Resource` type so one cache can be shared (e.g.
+    inherited) by many types. `Registry.written` discards the id of a model
+    when it is written so, as long as writes are reported to it, a created
+    model is never reported missing.
+
+    `ttl`
+        Seconds an id is remembered as missing. Defaults to 5.
+
+    `maxsize`
+        Maximum number of ids to remember. Defaults to 1024.
+
+    """
+
+    Info = collections.namedtuple('Info', [
+        'absorbed', 'expired', 'maxsize', 'currsize',
+    ])
+
+    def __init__(self, ttl=5, maxsize=1024):
+        self.ttl = ttl
+        self.entries = LRU(maxsize=maxsize, weak=True)
+        self.absorbed = 0
+        self.expired = 0
+        self.lock = threading.Lock()
+
+    def add(self, resource_cls, id):
+        """
+        Remembers a decoded id of a `Resource` type as missing.
+        """
+        self.entries.set((resource_cls, id), time.time() + self.ttl)
+
+    def discard(self, resource_cls, id):
+        """
+        Forgets a decoded id of a `Resource` type, e.g. because its model was
+        just created.
+        """
+        self.entries.discard((resource_cls, id))
+
+    def clear(self):
+        """
+        Forgets all ids and resets counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.absorbed = self.expired = 0
+
+    def info(self):
+        """
+        :returns: `NegativeCache.Info` with how many lookups were absorbed,
+                  how many entries expired, maxsize and currsize.
+        """
+        with self.lock:
+            return self.Info(
+                self.absorbed, self.expired, self.entries.maxsize,
+                len(self.entries),
+            )
+
+    def __contains__(self, key):
+        """
+        :param key: Tuple of `Resource` type and decoded id.
+        """
+        with self.lock:
+            expires_at = self.entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < time.time():
+                self.entries.discard(key)
+                self.expired += 1
+                return False
+            self.absorbed += 1
+            return True
+
+
+class Histogram(object):
+    """
+    Thread-safe counts of observed latencies, in seconds, by bucket. Each
+    `Binding` keeps one (as `Binding.latency`) of its calls made by
+    `Resource.get` which you can use to e.g. tune hedging (see
+    `Resource.bind`):
+
+    .. code:: python
+
+        Something.b.cache.latency.percentile(0.99)
+        Something.b.cache.latency.buckets()
+
+    `bounds`
+        Sorted upper bounds of the buckets. Latencies above the last bound
+        are counted in an overflow bucket bounded by `float('inf')`.
+
+    """
+
+    bounds = (
+        0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0,
+    )
+
+    def __init__(self, bounds=None):
+        if bounds is not None:
+            self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, latency):
+        """
+        Counts a latency.
+        """
+        index = bisect.bisect_left(self.bounds, latency)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum += latency
+
+    def buckets(self):
+        """
+        :returns: List of (upper bound, count) pairs.
+        """
+        with self.lock:
+            return zip(self.bounds + (float('inf'),), self.counts)
+
+    def percentile(self, p):
+        """
+        Upper bound of the bucket containing the `p` (e.g. 0.99) percentile or
+        None if nothing has been observed.
+        """
+        with self.lock:
+            if not self.total:
+                return None
+            rank, seen = p * self.total, 0
+            for bound, count in zip(self.bounds, self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return float('inf')
+
+    def mean(self):
+        with self.lock:
+            return self.sum / self.total if self.total else None
+
+    def clear(self):
+        with self.lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.total = 0
+            self.sum = 0.0
+
+
 class Binding(object):
     """
     A `Binding` is what you use to link a model type to a `Resource`.
@@ -682,16 +1666,37 @@ class Binding(object):
     `polymorphic`
         Flag indicating whether this binding is polymorphic. Defaults to `False`.
 
+    `adapts_by_type`
+        Flag indicating whether `adapts` depends only on the type of the model
+        instance. If so `Registry.match_obj` caches what it resolves per type.
+        Set this to `False` if `adapts` inspects instance state. Defaults to
+        `True`.
+
+    `cache`
+        Flag indicating whether this binding only fronts later ones (e.g. a
+        cache fronting a database). If so, and it is not the last binding,
+        errors raised by its `get_many` are logged and `Resource.get` falls
+        through to the next binding as if it were disabled. Defaults to
+        `False`, i.e. errors are raised.
+
     """
 
     _order = itertools.count(0)
 
-    def __init__(self, name=None, polymorphic=False):
+    def __init__(self,
+                 name=None,
+                 polymorphic=False,
+                 adapts_by_type=True,
+                 cache=False,
+        ):
         if name is not None and not isinstance(name, basestring):
             raise TypeError('name={0!r} is not a string'.format(name))
         self._order = self._order.next()
         self.name = name
         self.polymorphic = polymorphic
+        self.adapts_by_type = adapts_by_type
+        self.cache = cache
+        self.latency = Histogram()
 
     def get(self, id):
         """
@@ -703,22 +1708,75 @@ class Binding(object):
         """
         raise NotImplementedError
 
-    @property
-    def enabled(self):
+    def fill(self, obj):
         """
-        This can be used to disable a binding so that it won't be used when
-        adapting model objects to `Resource`s (e.g. maybe the data-store for a
-        binding is offline).
+        Populates this binding's data-store with a model instance retrieved
+        from a later binding, see `Resource.bind`. By default does nothing.
 
-        :returns: `True` if it enabled, otherwise `False`.
+        :param obj: Model instance from a later binding.
         """
-        return True
 
-    def cast(self, obj):
-        """
-        Convert a model instance to its an equivalent adapts by this binding.
+    def evict(self, id):
         """
-        raise NotImplementedError
+        Drops a model instance from this binding's data-store because it was
+        written through a later binding, see `Registry.written`. By default
+        does nothing.
+
+        :param id: A *decoded* id (see `Id`).
+        """
+
+    def get_many(self, ids):
+        """
+        Retrieves many model instances by id (see `Id`). Override this if your
+        data-store can do it in one round trip, by default it calls `get` for
+        each id.
+
+        :param ids: List of *decoded* ids (see `Id`).
+
+        :returns: List of the underlying model objects, or None for those not
+                  present, in the same order as `ids`.
+        """
+        return [self.get(id) for id in ids]
+
+    @property
+    def enabled(self):
+        """
+        This can be used to disable a binding so that it won't be used when
+        adapting model objects to `Resource`s (e.g. maybe the data-store for a
+        binding is offline).
+
+        :returns: `True` if it enabled, otherwise `False`.
+        """
+        return True
+
+    def allow(self):
+        """
+        Called by `Resource.get` right before using this binding, which it
+        skips if this is `False`. Unlike reading `enabled` this may change
+        state (e.g. a `Breaker` letting its one half-open probe through).
+
+        :returns: `enabled` by default.
+        """
+        return self.enabled
+
+    def cast(self, obj):
+        """
+        Convert a model instance to its an equivalent adapts by this binding.
+        """
+        raise NotImplementedError
+
+    def changes(self, obj):
+        """
+        Names of the attributes of a model instance changed since it was
+        adapted, used by `Resource.refresh` to only re-map what they affect.
+        By default None, i.e. unknown.
+
+        :param obj: Model instance.
+
+        :returns: Iterable of attribute names, which must include every
+                  change, or None if unknown.
+        """
+        return None
 
     def adapts(self, obj):
         """
@@ -731,6 +1789,180 @@ class Binding(object):
         raise NotImplementedError
 
 
+class Breaker(Binding):
+    """
+    Circuit breaker wrapping a `Binding` which drives `Binding.enabled` and
+    `Binding.allow` from how its `get` calls have been going:
+
+    .. code:: python
+
+        Something.bind(
+            hype.Breaker(Cache(models.CachedOther), slow=0.05),
+            DB(models.Other),
+        )
+
+    While "closed" calls go through and their outcomes are tracked. Once at
+    least `min_calls` of the last `window` calls have been made and
+    `threshold` of them failed (i.e. raised one of `errors` or took longer
+    than `slow` seconds) it "opens" and the binding is disabled. After
+    `reset_after` seconds it goes "half-open" and lets a single probe call
+    through, closing again if that succeeds and re-opening if it fails. Only
+    `allow` changes state (e.g. takes the probe), `enabled` just tells
+    whether it would allow a call.
+
+    Errors are recorded and re-raised, `Resource.get` only falls through to
+    the next binding if the wrapped one is a `Binding.cache`. Everything else
+    is delegated to the wrapped binding.
+    """
+
+    CLOSED = 'closed'
+
+    OPEN = 'open'
+
+    HALF_OPEN = 'half-open'
+
+    Info = collections.namedtuple('Info', [
+        'state', 'calls', 'failures', 'opened_at', 'mean_latency', 'max_latency',
+    ])
+
+    def __init__(self,
+                 binding,
+                 window=20,
+                 min_calls=5,
+                 threshold=0.5,
+                 slow=None,
+                 reset_after=30,
+                 errors=(Exception,),
+        ):
+        super(Breaker, self).__init__(
+            name=binding.name,
+            polymorphic=binding.polymorphic,
+            adapts_by_type=binding.adapts_by_type,
+            cache=binding.cache,
+        )
+        self.binding = binding
+        self.min_calls = min_calls
+        self.threshold = threshold
+        self.slow = slow
+        self.reset_after = reset_after
+        self.errors = errors
+        self.outcomes = collections.deque(maxlen=window)
+        self.latencies = collections.deque(maxlen=window)
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.probed_at = None
+        self.lock = threading.Lock()
+
+    def info(self):
+        """
+        :returns: `Breaker.Info` describing the state and recent calls.
+        """
+        with self.lock:
+            latencies = list(self.latencies)
+            return self.Info(
+                state=self.state,
+                calls=len(self.outcomes),
+                failures=sum(self.outcomes),
+                opened_at=self.opened_at,
+                mean_latency=(
+                    sum(latencies) / len(latencies) if latencies else None
+                ),
+                max_latency=max(latencies) if latencies else None,
+            )
+
+    def _open(self):
+        logger.warning('%s opened for %s', self, self.binding)
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        self.probed_at = None
+        self.outcomes.clear()
+
+    def _record(self, failed, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            if self.state == self.HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    logger.info('%s closed for %s', self, self.binding)
+                    self.state = self.CLOSED
+                    self.probed_at = None
+                return
+            self.outcomes.append(failed)
+            if (len(self.outcomes) >= self.min_calls and
+                sum(self.outcomes) >= self.threshold * len(self.outcomes)):
+                self._open()
+
+    def _call(self, func, arg):
+        started_at = time.time()
+        try:
+            result = func(arg)
+        except self.errors:
+            self._record(True, time.time() - started_at)
+            raise
+        latency = time.time() - started_at
+        self._record(self.slow is not None and latency > self.slow, latency)
+        return result
+
+    def __getattr__(self, name):
+        if name == 'binding':
+            raise AttributeError(name)
+        return getattr(self.binding, name)
+
+    # Binding
+
+    def get(self, id):
+        return self._call(self.binding.get, id)
+
+    def get_many(self, ids):
+        return self._call(self.binding.get_many, ids)
+
+    def fill(self, obj):
+        return self.binding.fill(obj)
+
+    def evict(self, id):
+        return self.binding.evict(id)
+
+    @property
+    def enabled(self):
+        if not self.binding.enabled:
+            return False
+        with self.lock:
+            return self._allows(time.time())
+
+    def allow(self):
+        if not self.binding.allow():
+            return False
+        with self.lock:
+            now = time.time()
+            if not self._allows(now):
+                return False
+            if self.state != self.CLOSED:
+                # the probe
+                self.state = self.HALF_OPEN
+                self.probed_at = now
+            return True
+
+    def _allows(self, now):
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return now - self.opened_at >= self.reset_after
+        # half-open, a probe is let through every reset_after
+        return (
+            self.probed_at is None or now - self.probed_at >= self.reset_after
+        )
+
+    def cast(self, obj):
+        return self.binding.cast(obj)
+
+    def changes(self, obj):
+        return self.binding.changes(obj)
+
+    def adapts(self, obj):
+        return self.binding.adapts(obj)
+
+
 class Bindings(collections.defaultdict):
     """
     Mapping of `Resource` types to a list of its registered `Binding`s. This is
@@ -803,6 +2035,246 @@ class Bindings(collections.defaultdict):
         return self[resource_cls]
 
 
+class MappingPlan(object):
+    """
+    Mapping of a `Resource` type's fields from plain model objects, compiled
+    once per type. Fields without hooks, translations or constraints (e.g. a
+    bare `String`) whose values are model attributes `pilo.DefaultSource`
+    takes as-is (e.g. a `str`) are read directly, as nothing would munge,
+    filter or invalidate them. Everything else (computes, hooks, dotted
+    sources, values needing coercion, nulls, missing attributes, ...) falls
+    back to `Field.map`, which resolves from the source as usual.
+
+    Source fields are mapped before computed ones (e.g. `Link`), so those read
+    rather than re-map the fields they depend on.
+
+    Values mapped ahead of time for many objects at once (see `premap`) are
+    taken from the ``premapped`` context variable if set.
+
+    Also compiled is what each field depends on (see `dirty`): the model
+    attribute it is mapped from, the fields and attributes its `Link`
+    parameters reference and those declared in `Resource.Options`.
+    Computed fields without declared dependencies depend on everything.
+    """
+
+    @staticmethod
+    def _parse_string(field, value):
+        return value if isinstance(value, basestring) else pilo.NOT_SET
+
+    @staticmethod
+    def _parse_integer(field, value):
+        if isinstance(value, (int, long)) and not isinstance(value, bool):
+            return value
+        return pilo.NOT_SET
+
+    @staticmethod
+    def _parse_float(field, value):
+        return value if isinstance(value, float) else pilo.NOT_SET
+
+    @staticmethod
+    def _parse_boolean(field, value):
+        return value if isinstance(value, bool) else pilo.NOT_SET
+
+    @staticmethod
+    def _parse_datetime(field, value):
+        return value if isinstance(value, datetime.datetime) else pilo.NOT_SET
+
+    @staticmethod
+    def _parse_id(field, value):
+        try:
+            return field.encode(value)
+        except ValueError:
+            return pilo.NOT_SET
+
+    #: Parsers of values taken as-is, by the field type defining `_parse`.
+    parsers = {
+        pilo.fields.String: _parse_string.__func__,
+        pilo.fields.Integer: _parse_integer.__func__,
+        pilo.fields.Float: _parse_float.__func__,
+        pilo.fields.Boolean: _parse_boolean.__func__,
+        pilo.fields.Datetime: _parse_datetime.__func__,
+        Id: _parse_id.__func__,
+    }
+
+    #: `_validate`s checking nothing but (unset) `constraints` for non-nulls.
+    validators = [
+        pilo.Field._validate.__func__,
+        pilo.fields.String._validate.__func__,
+        pilo.fields.Number._validate.__func__,
+        pilo.fields.Datetime._validate.__func__,
+    ]
+
+    constraints = [
+        'translations', 'ignores', 'alphabet', 'choices', 'pattern_re',
+        'min_length', 'max_length', 'min_value', 'max_value',
+        'after_value', 'before_value',
+    ]
+
+    @classmethod
+    def suitable_for(cls, src, obj):
+        """
+        Whether a `src` of `obj` resolves fields as attributes of `obj`.
+        """
+        return (
+            type(src) is pilo.DefaultSource and
+            not src.aliases and
+            not src.ignores and
+            cls.plain(obj)
+        )
+
+    @staticmethod
+    def plain(obj):
+        """
+        Whether `obj` is a plain model object, i.e. one `pilo.DefaultSource`
+        only resolves attributes of.
+        """
+        return getattr(type(obj), '__getitem__', None) is None
+
+    @staticmethod
+    def _overrides(field, method):
+        return (
+            getattr(type(field), method).__func__ is not
+            getattr(pilo.Field, method).__func__
+        )
+
+    @classmethod
+    def _computed(cls, field):
+        return bool(field.compute) or cls._overrides(field, '_compute')
+
+    @classmethod
+    def _parser(cls, field):
+        if field.resolve or field.parse or cls._overrides(field, '_resolve'):
+            return None
+        if not isinstance(field.src, basestring) or not field.src:
+            return None
+        if '.' in field.src or field.src.endswith('()'):
+            return None
+        for base in inspect.getmro(type(field)):
+            if '_parse' in vars(base):
+                return cls.parsers.get(base)
+
+    @classmethod
+    def _bare(cls, field):
+        if field.munge or field.filter or field.validate or field.attach_parent:
+            return False
+        if any(getattr(field, name, None) for name in cls.constraints):
+            return False
+        return (
+            not cls._overrides(field, '_munge') and
+            not cls._overrides(field, '_filter') and
+            type(field)._validate.__func__ in cls.validators
+        )
+
+    @classmethod
+    def _depends(cls, resource_cls, field):
+        declared = resource_cls.Options.dependencies.get(field.name)
+        names = set([field.name] + list(declared or ()))
+        if isinstance(field, Link):
+            for _, param in field._params:
+                names.add(param.name if isinstance(param, pilo.Field) else param[0])
+        elif cls._computed(field) or field.resolve or not field.src:
+            if declared is None:
+                return None
+        elif isinstance(field.src, basestring):
+            names.add(field.src.split('.')[0].rstrip('()'))
+        return names
+
+    def __init__(self, resource_cls):
+        sourced, computed = [], []
+        self.dependents = collections.defaultdict(set)
+        self.volatile = set()
+        for field in resource_cls.fields:
+            names = self._depends(resource_cls, field)
+            if names is None:
+                self.volatile.add(field.name)
+            else:
+                for name in names:
+                    self.dependents[name].add(field.name)
+            if self._computed(field):
+                computed.append((field, None, None))
+                continue
+            parse = self._parser(field) if self._bare(field) else None
+            if parse is not None:
+                sourced.append((field, field.src, parse))
+            else:
+                sourced.append((field, None, None))
+        self.steps = tuple(sourced + computed)
+
+    def dirty(self, names):
+        """
+        Fields needing to be re-mapped after changes.
+
+        :param names: Names of changed model attributes and/or fields.
+
+        :returns: Tuple of fields depending, directly or not, on `names` in
+            the order they are mapped.
+        """
+        dirty = set()
+        pending = list(names) + list(self.volatile)
+        while pending:
+            name = pending.pop()
+            if name in self.volatile and name not in dirty:
+                dirty.add(name)
+            for dependent in self.dependents.get(name, ()):
+                if dependent not in dirty:
+                    dirty.add(dependent)
+                    pending.append(dependent)
+        return tuple(step[0] for step in self.steps if step[0].name in dirty)
+
+    def premap(self, objs):
+        """
+        Maps `Id` fields read directly for many plain model objects at once
+        (see `Id.encode_many`). Those failing to encode are left out, to be
+        mapped (and fail) one at a time.
+
+        :param objs: List of model objects.
+
+        :returns: Mapping of (field, `id` of object) to mapped value.
+        """
+        premapped = {}
+        for field, attr, parse in self.steps:
+            if attr is None or not isinstance(field, Id):
+                continue
+            keys, values = [], []
+            for obj in objs:
+                if not self.plain(obj):
+                    continue
+                try:
+                    value = getattr(obj, attr)
+                except (AttributeError, TypeError):
+                    continue
+                if value is not None:
+                    keys.append((field, id(obj)))
+                    values.append(value)
+            try:
+                premapped.update(itertools.izip(keys, field.encode_many(values)))
+            except (TypeError, ValueError):
+                continue
+        return premapped
+
+    def __call__(self, form, obj, fields=None):
+        premapped = getattr(form.ctx, 'premapped', None)
+        for field, attr, parse in self.steps:
+            if fields is not None and field not in fields:
+                continue
+            if premapped and (field, id(obj)) in premapped:
+                form[field.name] = premapped[field, id(obj)]
+                continue
+            if attr is not None:
+                try:
+                    value = getattr(obj, attr)
+                except (AttributeError, TypeError):
+                    value = None
+                if value is not None:
+                    value = parse(field, value)
+                    if value is not pilo.NOT_SET:
+                        form[field.name] = value
+                        continue
+            value = field.map()
+            if value not in pilo.IGNORE:
+                form[field.name] = value
+
+
 class Resource(pilo.Form):
     """
     The Resource used to represent you model type(s) via flask. They are:
@@ -836,12 +2308,51 @@ class Resource(pilo.Form):
 
         Something.bind(DBBinding(model.Something))
 
+    Pass `fields` to map only some fields (i.e. a sparse fieldset), leaving
+    the rest uncomputed:
+
+    .. code:: python
+
+        something = Something(obj, fields=['link', 'id'])
+
+    or `lazy` to map each field from `obj` when first accessed, as an
+    attribute or item, and the rest once iterated (e.g. when encoded). Only
+    the `Id` field (or the first if there is none) is mapped up front, and
+    all of them if that maps to nothing, so lazy resources are never empty
+    dicts (which e.g. the C accelerated `json` encoders would encode without
+    iterating):
+
+    .. code:: python
+
+        something = Something(obj, lazy=True)
+        assert something.link  # maps link and the id it depends on
+
+    `dict` methods map what they need but copying with `dict(something)` (or
+    `{}.update(something)`) reads what is mapped directly, so `materialize`
+    first:
+
+    .. code:: python
+
+        copied = dict(something.materialize())
+
     """
 
     class __metaclass__(pilo.Form.__metaclass__):
 
         def __new__(mcs, name, bases, dikt):
             cls = pilo.Form.__metaclass__.__new__(mcs, name, bases, dikt)
+            options = [dikt['Options']] if 'Options' in dikt else []
+            for base in bases:
+                base_options = getattr(base, 'Options', None)
+                if base_options is not None and base_options not in options:
+                    options.append(base_options)
+            if options:
+                # own type, inheriting declared and base options
+                cls.Options = type(str('Options'), tuple(options), {})
+            cls._id_field = next(
+                (field for field in cls.fields if isinstance(field, Id)), None
+            )
+            cls._plan = MappingPlan(cls)
             if cls.registry is not None:
                 cls.registry.add(cls)
                 if cls.registry.resource_cls is cls:
@@ -854,49 +2365,491 @@ class Resource(pilo.Form):
     #: Bindings used to adapt objects to `Resource`s. Set for you.
     bindings = b = None
 
+    #: How bindings missing a model get filled from later ones, see `bind`.
+    fill_policy = None
+
+    fill_policies = [None, 'sync', 'deferred']
+
+    #: Optional `NegativeCache` of ids missing from all bindings, see `bind`.
+    negative_cache = None
+
+    #: Optional seconds after which lookups are hedged, see `bind`.
+    hedge_after = None
+
     @classmethod
-    def bind(cls, *bindings):
+    def bind(cls, *bindings, **kwargs):
         """
         Registers one of more `Binding` for this `Resource` type.
 
         :param bindings: Zero or more `Binding`s.
+        :param fill: What to do when `get` finds a model in one binding after
+                     missing it in earlier ones (e.g. a cache fronting a
+                     database):
+
+                     - None, nothing (the default)
+                     - "sync", `Binding.fill` the earlier ones right away
+                     - "deferred", `Binding.fill` the earlier ones once the
+                       response has been sent (see `Registry.defer`)
+
+                     Report writes with `Registry.written` so what was
+                     filled is evicted, and so fills of models read before
+                     they were written are skipped.
+
+        :param negative_cache: Optional `NegativeCache` used to remember ids
+                               missing from all bindings.
+        :param hedge: Optional seconds after which, if a binding has not
+                      answered, `get` also asks the next binding concurrently
+                      and takes whichever finds the model first. Binding
+                      calls are then made from `Registry.hedge_pool` threads
+                      with the caller's request and application contexts
+                      (the very ones, not copies, and never torn down
+                      there), so bindings must only read those and must not
+                      depend on other thread locals (e.g. a scoped database
+                      session).
 
         """
+        fill = kwargs.pop('fill', pilo.NOT_SET)
+        negative_cache = kwargs.pop('negative_cache', pilo.NOT_SET)
+        hedge = kwargs.pop('hedge', pilo.NOT_SET)
+        if kwargs:
+            raise TypeError(
+                'Unexpected keyword argument(s) {0}'.format(', '.join(kwargs))
+            )
         if cls.b is None:
             raise Exception(
                 'Missing bindings, did you set {0}.registry'.format(cls)
             )
+        if fill is not pilo.NOT_SET:
+            if fill not in cls.fill_policies:
+                raise ValueError(
+                    'fill={0!r} invalid, should be one of {1}'
+                    .format(fill, cls.fill_policies)
+                )
+            cls.fill_policy = fill
+        if negative_cache is not pilo.NOT_SET:
+            cls.negative_cache = negative_cache
+        if hedge is not pilo.NOT_SET:
+            cls.hedge_after = hedge
         cls.b.extend(bindings)
+        cls.registry.invalidate()
+
+    @classmethod
+    def _fill(cls, bindings, obj, decoded_id, mark):
+        if cls.fill_policy == 'deferred':
+            cls.registry.defer(cls._fill_now, bindings, obj, decoded_id, mark)
+        elif cls.fill_policy == 'sync':
+            cls._fill_now(bindings, obj, decoded_id, mark)
+
+    @classmethod
+    def _fill_now(cls, bindings, obj, decoded_id, mark):
+        if cls.registry._written_since(cls, decoded_id, mark):
+            logger.info(
+                '%s %s written since read, not filling', cls, decoded_id,
+            )
+            return
+        for binding in bindings:
+            try:
+                binding.fill(obj)
+            except Exception:
+                logger.exception('%s fill failed for %s', binding, obj)
 
     #: The object this `Resource` instance is adapting.
     obj = None
 
-    @classmethod
-    def get(cls, id):
-        matched_cls = cls.registry.match_id(id, cls)
-        if not matched_cls:
-            logger.info('no resource with id %s', id)
+    class Options(object):
+        """
+        Options of a `Resource` type, kept apart from its fields so any name
+        can be used for those. Declare a nested `Options` class to change
+        them, which inherits the rest from base types:
+
+        .. code:: python
+
+            class Something(Resource):
+
+                class Options:
+
+                    version = 'updated_at'
+
+        """
+
+        #: Whether to map plain model objects using the `MappingPlan`
+        #: compiled for this type rather than resolving each field through
+        #: `pilo`.
+        compiled = True
+
+        #: Names of fields and/or model attributes computed fields depend on,
+        #: by field name, see `refresh`.
+        dependencies = {}
+
+        #: Name of a field whose value changes whenever the representation of
+        #: an object does (e.g. `updated_at`), see `etag`.
+        version = None
+
+    #: Fields mapped if not all, see `fieldset`.
+    _projection = None
+
+    #: Source and names of fields still to map if lazy.
+    _lazy_src = _lazy_names = None
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        lazy = kwargs.pop('lazy', False)
+        if fields is not None:
+            self._projection = self.fieldset(fields)
+        if not lazy or not args:
+            super(Resource, self).__init__(*args, **kwargs)
             return
-        decoded_id = id_field(matched_cls).decode(id)
-        candidates = 0
-        for binding in matched_cls.bindings:
-            if not binding.enabled:
+        super(Resource, self).__init__()
+        if isinstance(args[0], pilo.Source):
+            src = args[0]
+        elif isinstance(args[0], (list, tuple)):
+            src = self._seq_source(args[0])
+        else:
+            src = self._map_source(args[0])
+        self.obj = src.path().value
+        fields = self._projection or type(self).fields
+        if not fields:
+            return
+        self._lazy_src = src
+        self._lazy_names = set(field.name for field in fields)
+        first = type(self)._id_field
+        self._lazy_map(first.name if first in fields else fields[0].name)
+        if not super(Resource, self).__len__():
+            # seeded field ignored (e.g. missing) so would encode as {}
+            self._lazy_map()
+
+    def materialize(self):
+        """
+        Maps all fields of this lazy `Resource` still to be mapped. Needed
+        before copying it with e.g. `dict`, which bypasses `dict` methods.
+
+        :returns: This `Resource`.
+        """
+        if self._lazy_names:
+            self._lazy_map()
+        return self
+
+    @classmethod
+    def fieldset(cls, fields):
+        """
+        Plans a sparse fieldset. Plans are cached per resource type and set of
+        field names.
+
+        :param fields: Iterable of field names.
+
+        :returns: Tuple of fields named by `fields`, and the `Id` field which
+            identity (e.g. `__eq__`) depends on, in declaration order.
+
+        :raises ValueError: If any of `fields` are not fields of this type.
+        """
+        return _fieldset(cls, frozenset(fields))
+
+    def project(self, fields):
+        """
+        Projects this `Resource` onto a sparse fieldset. Fields already mapped
+        are copied, otherwise the projection is mapped from `obj`.
+
+        :param fields: Iterable of field names.
+
+        :returns: New instance of this `Resource` type.
+        """
+        projection = self.fieldset(fields)
+        if not all(field.name in self for field in projection):
+            return type(self)(self.obj, fields=fields)
+        projected = type(self)()
+        projected.obj = self.obj
+        projected._projection = projection
+        projected.update((field.name, self[field.name]) for field in projection)
+        return projected
+
+    def etag(self, variant=None, encoded=None):
+        """
+        Strong entity tag of this `Resource`'s representation, e.g. for
+        answering conditional requests:
+
+        .. code:: python
+
+            @flask_app.route('/somethings/<Something:something>')
+            def show_something(something):
+                etag = something.etag(variant='application/json')
+                if etag is not None and etag in flask.request.if_none_match:
+                    return flask.Response(status=304)
+                encoded = json.dumps(something)
+                if etag is None:
+                    etag = something.etag('application/json', encoded)
+                ...
+
+        If this type's `Options` name a `version` field the tag is a digest of
+        the type, id, version, projection and `variant` alone. Nothing else is
+        mapped so, for a lazy `Resource` (e.g. one from a `ResourceConverter`),
+        a match costs mapping the id and version. Otherwise it is a digest of
+        `encoded`.
+
+        :param variant: Anything else representations vary by (e.g. the
+            content type) as text.
+        :param encoded: This `Resource` encoded, needed if this type names no
+            `version`.
+
+        :returns: The tag, unquoted, or `None` if there is no `version` and
+            `encoded` was not given.
+        """
+        version = type(self).Options.version
+        if version is None:
+            if encoded is None:
+                return None
+            if isinstance(encoded, unicode):
+                encoded = encoded.encode('utf-8')
+            return hashlib.sha1(encoded).hexdigest()
+        id_name = getattr(type(self)._id_field, 'name', None)
+        parts = [
+            type(self).__name__,
+            repr(self[id_name] if id_name in self else None),
+            repr(self._field_value(version)),
+            ','.join(sorted(field.name for field in self._projection or ())),
+            variant or '',
+        ]
+        return hashlib.sha1(u'\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _field_value(self, name):
+        if name in self:
+            return self[name]
+        # e.g. not projected
+        projected = type(self)(self.obj, fields=[name])
+        return projected[name] if name in projected else None
+
+    @classmethod
+    def render_many(cls, objs, fields=None, chunk_size=100):
+        """
+        Renders model objects as this type, equivalent to:
+
+        .. code:: python
+
+            (Something(obj, fields=fields) for obj in objs)
+
+        but a chunk at a time, encoding the ids of a chunk in bulk (see
+        `Id.encode_many`) and building links shared within a chunk once. Use
+        `Registry.render_many` to match types for heterogeneous objects.
+
+        :param objs: Iterable of model objects.
+        :param fields: Optional sparse fieldset, see `fieldset`.
+        :param chunk_size: Number of objects rendered at a time.
+
+        :returns: Generator of instances of this type, which are dicts ready
+            to be encoded.
+        """
+        for chunk in _chunks(objs, chunk_size):
+            for resource in _render_many([(cls, obj) for obj in chunk], fields):
+                yield resource
+
+    @classmethod
+    def get(cls, id, lazy=False):
+        """
+        Retrieves a `Resource` by its encoded id from the first of its enabled
+        bindings that has it.
+
+        :param id: An *encoded* id (see `Id`).
+        :param lazy: Whether to map fields when accessed.
+
+        :returns: The `Resource` or None if not present.
+        """
+        return cls.get_many([id], lazy=lazy)[0]
+
+    @classmethod
+    def get_many(cls, ids, lazy=False):
+        """
+        Retrieves many `Resource`s by their encoded ids. Ids are grouped by
+        the resource type they match and each group is requested from the
+        bindings of that type with `Binding.get_many`, only falling through to
+        the next binding for ids the previous one did not have.
+
+        :param ids: List of *encoded* ids (see `Id`).
+        :param lazy: Whether to map fields when accessed.
+
+        :returns: List of `Resource`s, or None for those not present, in the
+                  same order as `ids`.
+        """
+        resources = [None] * len(ids)
+        identities = cls.registry.identities
+        mark = cls.registry._writes_mark()
+        pending = collections.OrderedDict()
+        for i, id in enumerate(ids):
+            matched_cls = cls.registry.match_id(id, cls)
+            if not matched_cls:
+                logger.info('no resource with id %s', id)
                 continue
-            candidates += 1
-            obj = binding.get(decoded_id)
-            if obj is not None:
+            decoded_id = id_field(matched_cls).decode(id)
+            if identities is not None:
+                resources[i] = identities.get((matched_cls, decoded_id))
+                if resources[i] is not None:
+                    continue
+            if (matched_cls.negative_cache is not None and
+                (matched_cls, decoded_id) in matched_cls.negative_cache):
+                continue
+            pending.setdefault(matched_cls, []).append((i, decoded_id))
+        for matched_cls, misses in pending.iteritems():
+            if matched_cls.hedge_after is None:
+                lookup = matched_cls._lookup
+            else:
+                lookup = matched_cls._hedged_lookup
+            hits, misses, queried = lookup(misses)
+            if not queried:
+                raise werkzeug.exceptions.ServiceUnavailable()
+            for i, decoded_id, binding, obj, missed in hits:
+                resource_cls = matched_cls
                 if binding.polymorphic:
-                    matched_cls = cls.registry.match_obj(obj, matched_cls)
-                return matched_cls(obj)
-        if candidates == 0:
-            raise werkzeug.exceptions.ServiceUnavailable()
+                    resource_cls = cls.registry.match_obj(obj, matched_cls)
+                resources[i] = resource_cls(obj, lazy=lazy)
+                if identities is not None:
+                    identities[(matched_cls, decoded_id)] = resources[i]
+                    identities[(resource_cls, decoded_id)] = resources[i]
+                if missed:
+                    matched_cls._fill(missed, obj, decoded_id, mark)
+            if (misses and
+                matched_cls.negative_cache is not None and
+                len(queried) == len(matched_cls.bindings)):
+                for _, decoded_id in misses:
+                    matched_cls.negative_cache.add(matched_cls, decoded_id)
+        return resources
+
+    @staticmethod
+    def _call_binding(binding, decoded_ids):
+        started_at = time.time()
+        try:
+            return binding.get_many(decoded_ids)
+        finally:
+            binding.latency.observe(time.time() - started_at)
+
+    @classmethod
+    def _swallows(cls, binding):
+        # i.e. whether an error is just a miss, see Binding.cache
+        return binding.cache and binding is not cls.bindings[-1]
+
+    @classmethod
+    def _lookup(cls, misses):
+        """
+        Asks enabled bindings in order for (index, decoded id) `misses`.
+        Bindings which fail but swallow the error (see `Binding.cache`) are
+        skipped and not counted as queried.
+
+        :returns: Tuple of hits as (index, decoded id, binding, model object,
+                  bindings that missed it), remaining misses and the bindings
+                  queried.
+        """
+        hits, queried = [], []
+        for binding in cls.bindings:
+            if not misses:
+                break
+            if not binding.allow():
+                continue
+            try:
+                objs = cls._call_binding(
+                    binding, [decoded_id for _, decoded_id in misses]
+                )
+            except Exception:
+                if not cls._swallows(binding):
+                    raise
+                logger.warning('%s failed', binding, exc_info=True)
+                continue
+            remaining = []
+            for (i, decoded_id), obj in zip(misses, objs):
+                if obj is None:
+                    remaining.append((i, decoded_id))
+                    continue
+                hits.append((i, decoded_id, binding, obj, list(queried)))
+            queried.append(binding)
+            misses = remaining
+        return hits, misses, queried
+
+    @classmethod
+    def _hedged_lookup(cls, misses):
+        """
+        Like `_lookup` but if the latest binding asked has not answered after
+        `hedge_after` seconds the next one is asked concurrently. Errors are
+        raised, or swallowed, as they are by `_lookup` as soon as they are
+        answered.
+        """
+        answers = Queue.Queue()
+        bindings = iter(cls.bindings)
+        unresolved = collections.OrderedDict(misses)
+        missed = collections.defaultdict(list)
+        hits, queried = [], []
+        state = {'outstanding': 0, 'exhausted': False}
+
+        def answer(binding, ids):
+            try:
+                objs = cls._call_binding(
+                    binding, [decoded_id for _, decoded_id in ids]
+                )
+            except Exception:
+                answers.put((binding, ids, None, sys.exc_info()))
+                return
+            answers.put((binding, ids, objs, None))
+
+        # the caller's very contexts, pushed as they are. A copy (or
+        # RequestContext.push) re-matches the request, so converts view args
+        # again, and tears it down when popped.
+        app_ctx = flask._app_ctx_stack.top
+        request_ctx = flask._request_ctx_stack.top
+
+        def call(*args):
+            if app_ctx is not None:
+                flask._app_ctx_stack.push(app_ctx)
+            if request_ctx is not None:
+                flask._request_ctx_stack.push(request_ctx)
+            try:
+                return answer(*args)
+            finally:
+                if request_ctx is not None:
+                    flask._request_ctx_stack.pop()
+                if app_ctx is not None:
+                    flask._app_ctx_stack.pop()
+
+        def ask():
+            for binding in bindings:
+                if not binding.allow():
+                    continue
+                queried.append(binding)
+                state['outstanding'] += 1
+                cls.registry.hedge_pool.apply_async(
+                    call, (binding, unresolved.items())
+                )
+                return
+            state['exhausted'] = True
+
+        ask()
+        while unresolved and state['outstanding']:
+            try:
+                binding, ids, objs, exc_info = answers.get(
+                    timeout=None if state['exhausted'] else cls.hedge_after
+                )
+            except Queue.Empty:
+                ask()
+                continue
+            state['outstanding'] -= 1
+            if exc_info is not None:
+                if not cls._swallows(binding):
+                    raise exc_info[0], exc_info[1], exc_info[2]
+                logger.warning('%s failed', binding, exc_info=exc_info)
+                queried.remove(binding)
+                objs = ()
+            for (i, decoded_id), obj in zip(ids, objs):
+                if i not in unresolved:
+                    continue
+                if obj is None:
+                    missed[i].append(binding)
+                    continue
+                del unresolved[i]
+                hits.append((i, decoded_id, binding, obj, missed[i]))
+            if unresolved and not state['outstanding']:
+                ask()
+        return hits, unresolved.items(), queried
 
     def __eq__(self, other):
         if not isinstance(other, Resource):
-            return super(Resource, self).__eq__(other)
+            return super(Resource, self.materialize()).__eq__(other)
         self_id, other_id = id_field(type(self), None), id_field(type(other), None)
-        if id is None or other_id is None:
-            return super(Resource, self).__eq__(other)
+        if self_id is None or other_id is None:
+            return super(Resource, self.materialize()).__eq__(other.materialize())
         return self_id.__get__(self) == other_id.__get__(other)
 
     def __ne__(self, other):
@@ -906,14 +2859,224 @@ class Resource(pilo.Form):
         field = id_field(type(self), None)
         if field is None:
             return super(Resource, self).__hash__()
-        return field.__get__(self)
+        return hash(field.__get__(self))
+
+    def _lazy_map(self, name=None):
+        # raised as they happen, as pilo.Form.__init__ would have once mapped
+        errors = pilo.fields.RaiseErrors()
+        names = self._lazy_names
+        with self.ctx(src=self._lazy_src, errors=errors, form=self, parent=self):
+            for field in self._projection or type(self).fields:
+                if field.name not in names:
+                    continue
+                if name is not None and field.name != name:
+                    continue
+                names.discard(field.name)
+                value = field.map()
+                if value not in pilo.IGNORE:
+                    self[field.name] = value
+        if not names:
+            self._lazy_src = self._lazy_names = None
+
+    # dict
+
+    def __contains__(self, key):
+        # pilo.Field.__get__ checks this before mapping itself
+        if self._lazy_names and key in self._lazy_names:
+            self._lazy_map(key)
+        return super(Resource, self).__contains__(key)
+
+    def __missing__(self, key):
+        if self._lazy_names and key in self._lazy_names:
+            self._lazy_map(key)
+            if super(Resource, self).__contains__(key):
+                return super(Resource, self).__getitem__(key)
+        raise KeyError(key)
+
+    def __nonzero__(self):
+        return bool(self._lazy_names) or super(Resource, self).__len__() > 0
+
+    def __iter__(self):
+        return super(Resource, self.materialize()).__iter__()
+
+    def __len__(self):
+        return super(Resource, self.materialize()).__len__()
+
+    def keys(self):
+        return super(Resource, self.materialize()).keys()
+
+    def values(self):
+        return super(Resource, self.materialize()).values()
+
+    def items(self):
+        return super(Resource, self.materialize()).items()
+
+    def iterkeys(self):
+        return super(Resource, self.materialize()).iterkeys()
+
+    def itervalues(self):
+        return super(Resource, self.materialize()).itervalues()
+
+    def iteritems(self):
+        return super(Resource, self.materialize()).iteritems()
+
+    def viewkeys(self):
+        return super(Resource, self.materialize()).viewkeys()
+
+    def viewvalues(self):
+        return super(Resource, self.materialize()).viewvalues()
+
+    def viewitems(self):
+        return super(Resource, self.materialize()).viewitems()
+
+    def has_key(self, key):
+        return key in self
+
+    def pop(self, key, *default):
+        self.__contains__(key)
+        return super(Resource, self).pop(key, *default)
+
+    def popitem(self):
+        return super(Resource, self.materialize()).popitem()
+
+    def setdefault(self, key, default=None):
+        self.__contains__(key)
+        return super(Resource, self).setdefault(key, default)
 
-    def refresh(self, obj=None):
-        src = pilo.DefaultSource(self.obj if obj is None else obj)
-        return self.map(src, reset=True, error='raise')
+    def copy(self):
+        return super(Resource, self.materialize()).copy()
+
+    def __repr__(self):
+        return super(Resource, self.materialize()).__repr__()
+
+    def refresh(self, obj=None, fields=None):
+        """
+        Re-maps this `Resource` after its model changed:
+
+        .. code:: python
+
+            class Something(Resource):
+
+                class Options:
+
+                    dependencies = {'total': ['count', 'price']}
+
+                ...
+
+            something.obj.count += 1
+            something.refresh(fields=['count'])  # re-maps count and total
+
+        :param obj: Optional model object to re-map from, defaults to `obj`.
+        :param fields: Names of changed model attributes and/or fields. Only
+            fields mapped from them, or depending on them (see `Link`s and
+            `Options.dependencies`), are re-mapped. Defaults to the changes reported
+            by the binding adapting the model (see `Binding.changes`) or, if
+            unknown, all.
+
+        :returns: This `Resource`.
+        """
+        obj = self.obj if obj is None else obj
+        if fields is None:
+            fields = self._changes(obj)
+        if fields is None or (obj is not self.obj and self._lazy_names):
+            self._lazy_src = self._lazy_names = None
+            return self.map(pilo.DefaultSource(obj), reset=True, error='raise')
+        self.obj = obj
+        dirty = self._plan.dirty(fields)
+        if self._projection is not None:
+            dirty = [field for field in dirty if field in self._projection]
+        if self._lazy_names:
+            # still to be mapped, and so from the changed model
+            dirty = [field for field in dirty if field.name not in self._lazy_names]
+        for field in dirty:
+            super(Resource, self).pop(field.name, None)
+        errors = pilo.fields.RaiseErrors()
+        src = pilo.DefaultSource(obj)
+        with self.ctx(src=src, errors=errors, form=self, parent=self):
+            for field in dirty:
+                value = field.map()
+                if value not in pilo.IGNORE:
+                    self[field.name] = value
+        return self
+
+    def _changes(self, obj):
+        if self.bindings is None:
+            return None
+        for binding in self.bindings:
+            if binding.adapts(obj):
+                return binding.changes(obj)
 
     # pilo.Form
 
     def _map(self, tags, unmapped):
         self.obj = self.ctx.src_path.value
-        return super(Resource, self)._map(tags, unmapped)
+        self._lazy_src = self._lazy_names = None
+        if (type(self).Options.compiled and
+            not tags and
+            (not unmapped or unmapped == 'ignore') and
+            MappingPlan.suitable_for(self.ctx.src, self.obj)):
+            with self.ctx(form=self, parent=self):
+                self._plan(self, self.obj, self._projection)
+        elif self._projection is None:
+            return super(Resource, self)._map(tags, unmapped)
+        else:
+            with self.ctx(form=self, parent=self):
+                for field in self._projection:
+                    if tags and not tags & set(field.tags.keys()):
+                        continue
+                    value = field.map()
+                    if value not in pilo.IGNORE:
+                        self[field.name] = value
+        if self._projection is not None:
+            # drop fields computed along the way (e.g. a compute reading others)
+            names = set(field.name for field in self._projection)
+            for name in [name for name in self if name not in names]:
+                del self[name]
+
+
+@memoize(maxsize=1024)
+def _fieldset(resource_cls, names):
+    unknown = names - set(field.name for field in resource_cls.fields)
+    if unknown:
+        raise ValueError(
+            '{0} has no field(s) {1}'.format(
+                resource_cls.__name__, ', '.join(sorted(unknown))
+            )
+        )
+    return tuple(
+        field for field in resource_cls.fields
+        if field.name in names or field is resource_cls._id_field
+    )
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def _render_many(pairs, fields):
+    objs = collections.defaultdict(list)
+    for resource_cls, obj in pairs:
+        if resource_cls.Options.compiled:
+            objs[resource_cls].append(obj)
+    premapped = {}
+    for resource_cls, resource_objs in objs.iteritems():
+        premapped.update(resource_cls._plan.premap(resource_objs))
+    # rendered before yielding so the context is not left pushed
+    resources = []
+    with pilo.ctx(premapped=premapped, link_urls={}):
+        for resource_cls, obj in pairs:
+            resource = resource_cls(fields=fields)
+            if isinstance(obj, (list, tuple)):
+                src = resource._seq_source(obj)
+            else:
+                src = resource._map_source(obj)
+            errors = resource.map(src)
+            if errors:
+                raise errors[0]
+            resources.append(resource)
+    return resources
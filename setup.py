@@ -23,6 +23,7 @@ setuptools.setup(
     install_requires=[
         'Flask >=0.10,<0.11',
         'pilo >=0.4,<0.5',
+        'Werkzeug >=0.10,<1.1',
     ],
     extras_require={
         'test': [
@@ -1,25 +1,35 @@
 from __future__ import unicode_literals
 
+import base64
+import collections
+import datetime
 import decimal
+import gc
+import json
 import random
 import string
 import threading
+import time
 import uuid
 
+import flask
+from flask.ext import hype
+import pilo
 import pytest
+import werkzeug.routing
 import werkzeug.serving
 
 import hag
 import hags
 
 
-@pytest.fixture(scope='session', autouse=True)
+@pytest.fixture(scope='session')
 def init():
     hags.init()
     hags.models.db_metadata.create_all()
 
 
-@pytest.fixture(scope='session', autouse=True)
+@pytest.fixture(scope='session')
 def example_server(init, request):
     server = werkzeug.serving.make_server(
         app=hags.api.app, host='127.0.0.1', port=0,
@@ -30,7 +40,7 @@ def example_server(init, request):
     return 'http://{0}:{1}'.format(*server.server_address)
 
 
-@pytest.fixture(scope='session', autouse=True)
+@pytest.fixture(scope='session')
 def example_consume(init, request):
     consumer = hags.models.Consumer()
     thd = consumer.run_in_thread()
@@ -39,9 +49,10 @@ def example_consume(init, request):
 
 
 @pytest.fixture()
-def user():
+def user(init):
     user = hags.models.User.create(
-        email_address='{0}@de.isthmus'.format(uuid.uuid4().hex)
+        email_address='{0}@de.isthmus'.format(uuid.uuid4().hex),
+        password=uuid.uuid4().hex,
     )
     hags.models.db_session.commit()
     return user
@@ -55,7 +66,7 @@ def password(user):
 
 
 @pytest.fixture()
-def me(example_server, user, password):
+def me(example_server, example_consume, user, password):
     hag.configure(
         url=example_server,
         email_address=user.email_address,
@@ -144,3 +155,1033 @@ class TestExample(object):
             'rescued': 1,
             'total': 7
         }
+
+
+class TestRegistry(object):
+
+    def test_match_id(self, me):
+        registry = hags.api.Resource.registry
+        with hag.cli.use_headers((hags.config.API_HEADERS['admin'], hags.config.API_ADMIN)):
+            prisoner = hag.Prisoner.create('peep')
+
+        assert registry.match_id(me.id, hags.api.User) is hags.api.User
+        assert registry.match_id(prisoner.id) is hags.api.Prisoner
+        assert registry.match_id(prisoner.id, hags.api.User) is None
+        assert registry.match_id('zz-' + prisoner.id[3:]) is None
+
+
+class TestJSONBackends(object):
+
+    docs = [
+        {'a': 1, 'b': [1.5, 1e100, -0.0, 10 ** 20, True, False, None]},
+        {'\xfc': '\xf1 </script>', 'bytes': b'caf\xc3\xa9'},
+        [datetime.datetime(2020, 1, 2, 3, 4, 5, 6)],
+        collections.namedtuple('Pair', ['a', 'b'])(1, {'z': 1, 'a': (1, 2)}),
+        {}, [], '', 0,
+    ]
+
+    @pytest.mark.parametrize('mimes', [hags.mimes, hag.mimes])
+    @pytest.mark.parametrize('kwargs', [
+        {},
+        {'indent': 4, 'sort_keys': True, 'separators': (', ', ': ')},
+    ])
+    def test_conformance(self, mimes, kwargs):
+        expected = mimes.JSONEncoder(backend=json, **kwargs)
+        for backend in mimes.json_backends():
+            encoder = mimes.JSONEncoder(backend=backend, **kwargs)
+            source = type(
+                str('JSONSource'), (mimes.JSONSource,), {'backend': backend},
+            )
+            for doc in self.docs:
+                text = encoder.encode(doc)
+                assert text == expected.encode(doc)
+                self.assert_same(
+                    mimes.json_loads(text, backend=backend), json.loads(text),
+                )
+                self.assert_same(source(text).data, json.loads(text))
+            for doc in [decimal.Decimal('1.1'), object()]:
+                with pytest.raises(TypeError):
+                    encoder.encode([doc])
+
+    @classmethod
+    def assert_same(cls, value, expected):
+        assert type(value) is type(expected)
+        assert value == expected
+        if isinstance(expected, dict):
+            assert sorted(map(type, value)) == sorted(map(type, expected))
+            for key in expected:
+                cls.assert_same(value[key], expected[key])
+        elif isinstance(expected, list):
+            for v, e in zip(value, expected):
+                cls.assert_same(v, e)
+
+    @pytest.mark.parametrize('mime', [hags.mimes.json, hags.mimes.pretty_json])
+    def test_stream(self, mime):
+        page = {'items': self.docs, 'total': len(self.docs), 'empty': []}
+        streamed = dict(page, items=iter(self.docs), empty=iter([]))
+        assert ''.join(mime.stream(streamed)) == mime.encode(page)
+
+    @pytest.mark.parametrize('mime, kwargs', [
+        (hags.mimes.json, {'separators': (',', ':')}),
+        (hags.mimes.pretty_json, {
+            'indent': 4, 'sort_keys': True, 'separators': (', ', ': '),
+        }),
+    ])
+    def test_stream_keys(self, mime, kwargs):
+        page = {
+            'a': [1], 1: [2], 10 ** 20: [3], 2.5: [4], False: [5], None: [],
+        }
+        # NOTE: py2 json.dumps is C accelerated here and that has False as
+        # "False", iterencode is not
+        expected = ''.join(json.JSONEncoder(**kwargs).iterencode(page))
+        for key in page:
+            page[key] = iter(page[key])
+        assert ''.join(mime.stream(page)) == expected
+        with pytest.raises(TypeError):
+            ''.join(mime.stream({uuid.uuid4(): iter([])}))
+
+
+class TestMessagePack(object):
+
+    def test_me(self, me):
+        mime, hag.cli.mime = hag.cli.mime, hag.mimes.msgpack
+        try:
+            assert hag.me() == me
+        finally:
+            hag.cli.mime = mime
+
+
+class TestAccept(object):
+
+    def test_not_acceptable(self):
+        headers = {'Accept': 'text/html'}
+        with hags.api.app.test_request_context(headers=headers):
+            with pytest.raises(hags.api.exc.NotAcceptable):
+                flask.request.accept_mime()
+
+    def test_json(self):
+        headers = {'Accept': 'application/json'}
+        with hags.api.app.test_request_context(headers=headers):
+            assert flask.request.accept_mime() is hags.mimes.json
+        with hags.api.app.test_request_context('/?pretty=1', headers=headers):
+            assert flask.request.accept_mime() is hags.mimes.pretty_json
+
+
+class TestCompiled(object):
+
+    def test_user(self, user):
+        resource_cls = hags.api.User
+        with hags.api.app.test_request_context():
+            compiled = resource_cls(user)
+            resource_cls.Options.compiled = False
+            try:
+                mapped = resource_cls(user)
+            finally:
+                del resource_cls.Options.compiled
+        assert dict(compiled) == dict(mapped)
+
+    def test_render_many(self, user):
+        registry = hags.api.Resource.registry
+        with hags.api.app.test_request_context():
+            expected = [dict(hags.api.User(user))] * 3
+            rendered = hags.api.User.render_many([user] * 3)
+            assert [dict(resource) for resource in rendered] == expected
+            rendered = registry.render_many([user] * 3)
+            assert [dict(resource) for resource in rendered] == expected
+            with pytest.raises(TypeError):
+                list(registry.render_many([user, object()]))
+
+
+class TestLazy(object):
+
+    def test_user(self, user):
+        with hags.api.app.test_request_context():
+            resource = hags.api.User(user, lazy=True)
+            assert hype.is_lazy(resource)
+            assert resource.link == hags.api.User(user).link
+            assert hype.is_lazy(resource)
+            encoded = hags.mimes.json.encode(resource)
+            expected = hags.mimes.json.encode(hags.api.User(user))
+            assert json.loads(encoded) == json.loads(expected)
+            assert not hype.is_lazy(resource)
+
+    def test_dict(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='x')
+        with app.test_request_context():
+            expected = dict(thing_cls(obj))
+            assert dict(thing_cls(obj, lazy=True).materialize()) == expected
+            assert thing_cls(obj, lazy=True).copy() == expected
+            assert dict(thing_cls(obj, lazy=True).items()) == expected
+            assert sorted(thing_cls(obj, lazy=True)) == sorted(expected)
+            assert len(thing_cls(obj, lazy=True)) == len(expected)
+            assert thing_cls(obj, lazy=True).pop('name') == 'x'
+            assert repr(thing_cls(obj, lazy=True)) == repr(thing_cls(obj))
+
+    def test_missing_id(self, app, resource_cls):
+
+        class Thing(resource_cls):
+
+            id = hype.Id(
+                hags.codecs.Id(prefix='th-', encoding='base58'),
+                default=pilo.NONE,
+            )
+
+            name = pilo.fields.String()
+
+        with app.test_request_context():
+            resource = Thing(Model(name='x'), lazy=True)
+            assert not hype.is_lazy(resource)
+            assert json.loads(json.dumps(resource)) == {'name': 'x'}
+
+    def test_eq_without_id(self, app, resource_cls, thing_cls):
+
+        class Note(resource_cls):
+
+            text = pilo.fields.String()
+
+        with app.test_request_context():
+            a, b = Note(Model(text='a')), Note(Model(text='b'))
+            assert a != b
+            assert not a == b
+            assert a == Note(Model(text='a'))
+            assert Note(Model(text='a'), lazy=True) == a
+            assert Note(Model(text='b'), lazy=True) != a
+            thing = thing_cls(Model(id=uuid.uuid4(), name='a'))
+            assert a != thing
+            assert thing != a
+
+
+class TestRefresh(object):
+
+    def test_guess(self, user):
+        obj = hags.models.Prisoner.create(user, secret='abc')
+        hags.models.db_session.commit()
+        with hags.api.app.test_request_context():
+            prisoner = hags.api.Prisoner(obj)
+            assert prisoner.guess('a')
+            assert not prisoner.guess('z')
+            assert prisoner['hits'] == ['a']
+            assert prisoner['misses'] == ['z']
+            assert dict(prisoner) == dict(hags.api.Prisoner(prisoner.obj))
+
+
+class TestConditional(object):
+
+    def test_prisoner(self, user, password):
+        credentials = '{0}:{1}'.format(user.email_address, password)
+        headers = {
+            'Authorization': 'Basic {0}'.format(
+                base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+            ),
+        }
+        with hags.api.app.test_request_context():
+            obj = hags.models.Prisoner.create(user, secret='abc')
+            hags.models.db_session.commit()
+            prisoner = hags.api.Prisoner(obj)
+            id, uri = prisoner['id'], prisoner['link']
+        client = hags.api.app.test_client()
+        response = client.get(uri, headers=headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        headers['If-None-Match'] = etag
+        response = client.get(uri, headers=headers)
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert not response.data
+        with hags.api.app.test_request_context():
+            hags.api.Prisoner.get(id).guess('a')
+        response = client.get(uri, headers=headers)
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+
+class Model(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class DictBinding(hype.Binding):
+
+    def __init__(self, objs=None, *args, **kwargs):
+        self.objs = {} if objs is None else objs
+        self.calls = []
+        self.down = False
+        super(DictBinding, self).__init__(*args, **kwargs)
+
+    def get(self, id):
+        self.calls.append(id)
+        if self.down:
+            raise IOError('down')
+        return self.objs.get(id)
+
+    def adapts(self, obj):
+        return isinstance(obj, Model)
+
+
+class CachedModel(Model):
+
+    pass
+
+
+class CacheBinding(DictBinding):
+
+    def fill(self, obj):
+        self.objs[obj.id] = CachedModel(**obj.__dict__)
+
+    def evict(self, id):
+        self.objs.pop(id, None)
+
+    def adapts(self, obj):
+        return isinstance(obj, CachedModel)
+
+
+@pytest.fixture()
+def app():
+    return flask.Flask(__name__)
+
+
+@pytest.fixture()
+def resource_cls(app):
+
+    class Resource(hype.Resource):
+
+        registry = hype.Registry(app)
+
+    return Resource
+
+
+@pytest.fixture()
+def thing_cls(app, resource_cls):
+
+    class Thing(resource_cls):
+
+        link = hype.Link('thing.show', thing='id')
+
+        id = hype.Id(hags.codecs.Id(prefix='th-', encoding='base58'))
+
+        name = pilo.fields.String()
+
+    @app.route('/things/<Thing:thing>', endpoint='thing.show')
+    def show_thing(thing):
+        return thing['name']
+
+    return Thing
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+class TestIdIndex(object):
+
+    def test_candidates(self, resource_cls):
+
+        class Short(resource_cls):
+
+            id = hype.Id(hags.codecs.Id(prefix='s', encoding='base58'))
+
+        class Long(resource_cls):
+
+            id = hype.Id(hags.codecs.Id(prefix='sh-', encoding='base58'))
+
+        class Bare(resource_cls):
+
+            id = hype.Id()
+
+        index = hype.IdIndex(resource_cls.registry)
+        assert list(index.candidates('sh-2Jq8ke')) == [Long, Short, Bare]
+        assert list(index.candidates('s2Jq8ke')) == [Short, Bare]
+        assert list(index.candidates('x2Jq8ke')) == [Bare]
+        assert list(index.candidates(None)) == [Bare]
+
+    def test_match_id(self, resource_cls, thing_cls):
+        registry = resource_cls.registry
+        id = thing_cls.id.encode(uuid.uuid4())
+        assert registry.match_id(id) is thing_cls
+        assert registry.match_id('zz-' + id[3:]) is None
+
+        class Other(resource_cls):
+
+            id = hype.Id(hags.codecs.Id(prefix='zz-', encoding='base58'))
+
+        assert registry.match_id('zz-' + id[3:]) is Other
+        registry.discard(Other)
+        assert registry.match_id('zz-' + id[3:]) is None
+
+
+class TestMatchObj(object):
+
+    def test_cached_by_type(self, resource_cls, thing_cls):
+        binding = DictBinding()
+        thing_cls.bind(binding)
+        registry = resource_cls.registry
+        assert registry.match_obj(Model()) is thing_cls
+        assert registry.match_obj(object()) is None
+        assert registry._obj_matches.info().currsize == 2
+
+
+class TestIdentityMap(object):
+
+    def test_adapt(self, app, thing_cls):
+        thing_cls.registry.identity_map = True
+        thing_cls.bind(DictBinding())
+        registry = thing_cls.registry
+        obj = Model(id=uuid.uuid4(), name='a')
+        copy = Model(id=obj.id, name='b')
+        with app.test_request_context():
+            thing = registry.adapt(obj)
+            assert registry.adapt(obj) is thing
+            other = registry.adapt(copy)
+            assert other is not thing
+            assert other['name'] == 'b'
+            assert registry.adapt(copy) is other
+            assert thing_cls.get(thing['id']) is other
+        with app.test_request_context():
+            assert registry.adapt(obj) is not thing
+
+
+class TestConverter(object):
+
+    @pytest.mark.parametrize('lazy', [False, True])
+    def test_lazy(self, app, thing_cls, lazy):
+        thing_cls.registry.lazy_converters = lazy
+        obj = Model(id=uuid.uuid4(), name='a')
+        thing_cls.bind(DictBinding({obj.id: obj}))
+        converter = app.url_map.converters['Thing'](app.url_map)
+        with app.test_request_context():
+            thing = converter.to_python(thing_cls(obj)['id'])
+            assert isinstance(thing, thing_cls)
+            assert hype.is_lazy(thing) is lazy
+            assert thing['name'] == 'a'
+
+
+class TestOptions(object):
+
+    def test_inherited(self, resource_cls):
+
+        class Base(resource_cls):
+
+            class Options:
+
+                version = 'updated_at'
+
+        class Thing(Base):
+
+            class Options:
+
+                compiled = False
+
+        assert Thing.Options.version == 'updated_at'
+        assert not Thing.Options.compiled
+        assert Base.Options.compiled
+        assert resource_cls.Options is not hype.Resource.Options
+        assert hype.Resource.Options.version is None
+
+    def test_field_names(self, app, resource_cls):
+
+        class Thing(resource_cls):
+
+            class Options:
+
+                version = 'updated_at'
+
+            id = hype.Id(hags.codecs.Id(prefix='th-', encoding='base58'))
+
+            updated_at = pilo.fields.Datetime(format='iso8601')
+
+            version = pilo.fields.Integer()
+
+            compiled = pilo.fields.Boolean()
+
+            dependencies = pilo.fields.String()
+
+            projection = pilo.fields.String()
+
+            lazy = pilo.fields.String()
+
+        obj = Model(
+            id=uuid.uuid4(),
+            updated_at=datetime.datetime(2020, 1, 2, 3, 4, 5),
+            version=1,
+            compiled=False,
+            dependencies='a',
+            projection='b',
+            lazy='c',
+        )
+        with app.test_request_context():
+            thing = Thing(obj)
+            assert thing['version'] == 1
+            assert thing['compiled'] is False
+            assert dict(Thing(obj, lazy=True).materialize()) == dict(thing)
+            etag = thing.etag('json')
+            assert Thing(obj, lazy=True).etag('json') == etag
+            obj.version = 2
+            assert Thing(obj).etag('json') == etag
+            obj.updated_at = datetime.datetime(2020, 1, 2, 3, 4, 6)
+            assert Thing(obj).etag('json') != etag
+
+
+class TestDefer(object):
+
+    def test_after_response(self, app, resource_cls):
+        registry = resource_cls.registry
+        calls = []
+
+        @app.route('/')
+        def index():
+            registry.defer(
+                lambda: calls.append(
+                    (flask.has_request_context(), flask.has_app_context())
+                )
+            )
+            return 'ok'
+
+        response = app.test_client().get('/')
+        assert response.data == b'ok'
+        assert calls == []
+        response.close()
+        assert calls == [(False, True)]
+
+    def test_failed(self, app, resource_cls):
+        registry = resource_cls.registry
+        calls = []
+
+        @app.route('/')
+        def index():
+            registry.defer(calls.append, 'failed')
+            raise ValueError()
+
+        response = app.test_client().get('/')
+        assert response.status_code == 500
+        assert calls == ['failed']
+
+    def test_no_request(self, resource_cls):
+        calls = []
+        resource_cls.registry.defer(calls.append, 'now')
+        assert calls == ['now']
+
+
+class TestWritten(object):
+
+    def test_evicts_earlier_bindings(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='a')
+        cache, db = CacheBinding(), DictBinding({obj.id: obj})
+        thing_cls.bind(hype.Breaker(cache), db, fill='sync')
+        id = thing_cls.id.encode(obj.id)
+        with app.test_request_context():
+            assert thing_cls.get(id).obj is obj
+            assert isinstance(thing_cls.get(id).obj, CachedModel)
+            obj.name = 'b'
+            thing_cls.registry.written(obj)
+            assert cache.objs == {}
+            assert thing_cls.get(id)['name'] == 'b'
+        thing_cls.registry.written(object())
+
+    def test_skips_deferred_fill_of_written(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='a')
+        cache, db = CacheBinding(), DictBinding({obj.id: obj})
+        thing_cls.bind(cache, db, fill='deferred')
+        id = thing_cls.id.encode(obj.id)
+        with app.test_request_context():
+            assert thing_cls.get(id)['name'] == 'a'
+            obj.name = 'b'
+            thing_cls.registry.written(obj)
+        assert cache.objs == {}
+        with app.test_request_context():
+            assert thing_cls.get(id)['name'] == 'b'
+            assert cache.objs == {}
+        assert cache.objs[obj.id].name == 'b'
+
+    def test_forgotten_writes(self, app, thing_cls):
+        objs = [Model(id=uuid.uuid4(), name='a') for _ in range(3)]
+        cache = CacheBinding()
+        thing_cls.bind(cache, DictBinding(dict((o.id, o) for o in objs)),
+                       fill='sync')
+        thing_cls.registry.max_writes = 1
+        with app.test_request_context():
+            mark = thing_cls.registry._writes_mark()
+            thing_cls.registry.written(objs[0])
+            thing_cls.registry.written(objs[1])
+            thing_cls.get(thing_cls.id.encode(objs[2].id))
+            assert thing_cls.registry._written_since(thing_cls, objs[0].id, mark)
+            assert not thing_cls.registry._written_since(
+                thing_cls, objs[2].id, thing_cls.registry._writes_mark(),
+            )
+        assert cache.objs.keys() == [objs[2].id]
+
+
+class TestLRU(object):
+
+    def test_evicts_least_recently_used(self):
+        cache = hype.LRU(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.info() == (3, 1, 2, 2)
+        cache.discard('a')
+        assert cache.get('a', 0) == 0
+        cache.clear()
+        assert cache.info() == (0, 0, 2, 0)
+
+    def test_weak(self):
+        cache = hype.LRU(weak=True)
+        cls = type(str('Transient'), (object,), {})
+        cache.set((cls, 'a'), 1)
+        cache.set('b', 2)
+        assert cache.get((cls, 'a')) == 1
+        del cls
+        gc.collect()
+        assert cache.get('b') == 2
+        assert len(cache) == 1
+
+
+class TestMemoize(object):
+
+    def test_memoize(self):
+        calls = []
+
+        @hype.memoize(maxsize=2)
+        def double(value):
+            calls.append(value)
+            return value * 2
+
+        assert double(1) == 2
+        assert double(1) == 2
+        assert calls == [1]
+        assert double([1]) == [1, 1]  # unhashable so not cached
+        assert double([1]) == [1, 1]
+        assert calls == [1, [1], [1]]
+        assert double.cache_info() == (1, 1, 2, 1)
+        double.cache_clear()
+        assert double(1) == 2
+        assert calls == [1, [1], [1], 1]
+
+    def test_cleared_by_registry(self, app, resource_cls):
+
+        @resource_cls.registry.memoize
+        def names(resource_cls):
+            return sorted(cls.__name__ for cls in resource_cls.registry)
+
+        @hype.memoize
+        def double(value):
+            return value * 2
+
+        assert names(resource_cls) == ['Resource']
+        assert double(1) == 2
+
+        class Late(resource_cls):
+
+            pass
+
+        assert names(resource_cls) == ['Late', 'Resource']
+        resource_cls.registry.discard(Late)
+        assert names(resource_cls) == ['Resource']
+        # only what it memoized
+        assert double.cache_info().currsize == 1
+        hype.Registry(app).invalidate()
+        assert names.cache_info().currsize == 1
+
+
+class TestURLBuilder(object):
+
+    @staticmethod
+    def build(url_map, endpoint, values):
+        for rule in url_map.iter_rules(endpoint):
+            if not hype.URLBuilder.suitable_for(rule, values):
+                continue
+            path = hype.URLBuilder(rule, values)(values)
+            if path is not None:
+                return path
+
+    def test_build(self, app):
+        app.add_url_rule('/a/<int:n>/<name>', endpoint='a')
+        app.add_url_rule('/b/', endpoint='b', defaults={'page': 1})
+        app.add_url_rule('/b/<int:page>', endpoint='b')
+        with app.test_request_context():
+            for endpoint, values in [
+                    ('a', {'n': 1, 'name': 'x y/\xfc'}),
+                    ('a', {'n': 2, 'name': 'z', 'q': 'v w'}),
+                    ('b', {'page': 1}),
+                    ('b', {'page': 3}),
+                ]:
+                path = self.build(app.url_map, endpoint, values)
+                assert path == flask.url_for(endpoint, **values)
+
+    @pytest.mark.parametrize('trace, converters', [
+        (None, None),
+        ([], {}),
+        ([(False, '|'), (False, '/a/'), (True, 'n')], {}),
+        ([(False, '|'), (False, '/a/'), ('n',)], {'n': None}),
+        ([{'dynamic': False, 'data': '/a/'}], {}),
+        ((), ()),
+    ])
+    def test_uncompilable(self, trace, converters):
+        assert not hype.URLBuilder._compilable(trace, converters)
+
+    def test_fallback(self, app, monkeypatch):
+        app.add_url_rule('/a/<int:n>', endpoint='a')
+        rule = next(app.url_map.iter_rules('a'))
+        assert hype.URLBuilder._compilable(rule._trace, rule._converters)
+        monkeypatch.setattr(
+            hype.URLBuilder, '_compilable', staticmethod(lambda *args: False),
+        )
+        with app.test_request_context():
+            builder = hype.URLBuilder(rule, ['n', 'q'])
+            assert builder.parts is None
+            assert builder({'n': 1, 'q': 'x'}) == '/a/1?q=x'
+            assert builder({'n': 'x'}) is None
+
+    def test_unsuitable(self, app):
+        app.add_url_rule('/a/<int:n>', endpoint='a')
+        rule = next(app.url_map.iter_rules('a'))
+        assert not hype.URLBuilder.suitable_for(rule, ['m'])
+        assert not hype.URLBuilder.suitable_for(rule, ['n'], method='DELETE')
+
+    def test_link(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='a')
+        with app.test_request_context():
+            thing = thing_cls(obj)
+            assert thing['link'] == flask.url_for('thing.show', thing=thing['id'])
+
+    def test_bad_value(self, app):
+        app.add_url_rule('/a/<int:n>', endpoint='a')
+        link = hype.Link('a', n='n')
+        with app.test_request_context():
+            assert link._url_for(n=1) == '/a/1'
+            with pytest.raises(werkzeug.routing.BuildError):
+                link._url_for(n='x')
+            with pytest.raises(werkzeug.routing.BuildError):
+                hype.Link('b', n='n')._url_for(n=1)
+
+    def test_rules_replaced(self, app):
+        app.add_url_rule('/a/<int:n>', endpoint='a')
+        link = hype.Link('a', n='n')
+        with app.test_request_context():
+            assert link._url_for(n=1) == '/a/1'
+            # same number of rules, different paths
+            rule = next(app.url_map.iter_rules('a'))
+            app.url_map._rules.remove(rule)
+            app.url_map._rules_by_endpoint['a'].remove(rule)
+            app.add_url_rule('/b/<int:n>', endpoint='a')
+            assert link._url_for(n=1) == '/b/1'
+            # re-compiled
+            rule = next(app.url_map.iter_rules('a'))
+            rule.rule = '/c/<int:n>'
+            rule.refresh()
+            assert link._url_for(n=1) == '/c/1'
+
+
+class TestNegativeCache(object):
+
+    def test_ttl(self, clock, thing_cls):
+        cache = hype.NegativeCache(ttl=5, maxsize=2)
+        cache.add(thing_cls, 'a')
+        assert (thing_cls, 'a') in cache
+        assert (thing_cls, 'b') not in cache
+        assert (hype.Resource, 'a') not in cache
+        clock[0] += 6
+        assert (thing_cls, 'a') not in cache
+        assert cache.info() == (1, 1, 2, 0)
+        cache.add(thing_cls, 'a')
+        cache.discard(thing_cls, 'a')
+        assert (thing_cls, 'a') not in cache
+
+    def test_threads(self, thing_cls):
+        cache = hype.NegativeCache(ttl=5)
+        cache.add(thing_cls, 'a')
+
+        def lookup():
+            for _ in range(1000):
+                assert (thing_cls, 'a') in cache
+
+        thds = [threading.Thread(target=lookup) for _ in range(4)]
+        for thd in thds:
+            thd.start()
+        for thd in thds:
+            thd.join()
+        assert cache.info().absorbed == 4000
+
+    def test_get(self, app, thing_cls):
+        binding = DictBinding()
+        thing_cls.bind(binding, negative_cache=hype.NegativeCache())
+        id = thing_cls.id.encode(uuid.uuid4())
+        assert thing_cls.get(id) is None
+        assert thing_cls.get(id) is None
+        assert len(binding.calls) == 1
+
+    def test_written(self, app, thing_cls):
+        binding = DictBinding()
+        thing_cls.bind(binding, negative_cache=hype.NegativeCache())
+        obj = Model(id=uuid.uuid4(), name='a')
+        id = thing_cls.id.encode(obj.id)
+        assert thing_cls.get(id) is None
+        binding.objs[obj.id] = obj
+        assert thing_cls.get(id) is None
+        thing_cls.registry.written(obj)
+        with app.test_request_context():
+            assert thing_cls.get(id).obj is obj
+
+
+class TestBreaker(object):
+
+    def test_opens_and_recovers(self, clock):
+        binding = DictBinding({1: 'one'})
+        breaker = hype.Breaker(
+            binding, window=4, min_calls=2, threshold=0.5, reset_after=30,
+        )
+        assert breaker.enabled
+        assert breaker.get(1) == 'one'
+        binding.down = True
+        with pytest.raises(IOError):
+            breaker.get(1)
+        assert breaker.info().state == breaker.OPEN
+        assert not breaker.enabled
+        clock[0] += 31
+        assert breaker.enabled
+        assert breaker.enabled  # reading takes no probe
+        assert breaker.info().state == breaker.OPEN
+        assert breaker.allow()  # probe
+        assert breaker.info().state == breaker.HALF_OPEN
+        assert not breaker.enabled
+        assert not breaker.allow()
+        binding.down = False
+        assert breaker.get(1) == 'one'
+        assert breaker.info().state == breaker.CLOSED
+        assert breaker.enabled
+
+    def test_slow(self, clock):
+        binding = DictBinding({1: 'one'})
+        get = binding.get
+
+        def slow_get(id):
+            clock[0] += 1
+            return get(id)
+
+        binding.get = slow_get
+        breaker = hype.Breaker(binding, min_calls=1, slow=0.5)
+        assert breaker.get(1) == 'one'
+        assert breaker.info().state == breaker.OPEN
+
+    @pytest.mark.parametrize('hedge', [None, 1])
+    def test_cache_falls_through(self, app, thing_cls, hedge):
+        obj = Model(id=uuid.uuid4(), name='a')
+        cache, db = CacheBinding(cache=True), DictBinding({obj.id: obj})
+        cache.down = True
+        thing_cls.bind(
+            hype.Breaker(cache), db,
+            fill='sync', negative_cache=hype.NegativeCache(), hedge=hedge,
+        )
+        missing = thing_cls.id.encode(uuid.uuid4())
+        with app.test_request_context():
+            things = thing_cls.get_many([thing_cls.id.encode(obj.id), missing])
+        assert things[0].obj is obj
+        assert things[1] is None
+        # cache failed so neither missed nor known to be missing
+        assert cache.objs == {}
+        assert thing_cls.negative_cache.info().currsize == 0
+
+    @pytest.mark.parametrize('hedge', [None, 1])
+    def test_raises(self, thing_cls, hedge):
+        first, last = DictBinding(), CacheBinding(cache=True)
+        thing_cls.bind(hype.Breaker(first), hype.Breaker(last), hedge=hedge)
+        id = thing_cls.id.encode(uuid.uuid4())
+        first.down = True
+        with pytest.raises(IOError):
+            thing_cls.get(id)
+        first.down, last.down = False, True
+        with pytest.raises(IOError):
+            thing_cls.get(id)
+
+
+class TestHistogram(object):
+
+    def test_percentile(self):
+        histogram = hype.Histogram(bounds=[0.1, 1])
+        assert histogram.percentile(0.5) is None
+        assert histogram.mean() is None
+        for latency in [0.05, 0.05, 0.5, 2]:
+            histogram.observe(latency)
+        assert histogram.buckets() == [(0.1, 2), (1, 1), (float('inf'), 1)]
+        assert histogram.percentile(0.5) == 0.1
+        assert histogram.percentile(0.75) == 1
+        assert histogram.percentile(1) == float('inf')
+        assert abs(histogram.mean() - 0.65) < 1e-9
+        histogram.clear()
+        assert histogram.percentile(0.5) is None
+
+
+class TestHedging(object):
+
+    def test_hedges(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='a')
+        released = threading.Event()
+        slow, fast = DictBinding(), DictBinding({obj.id: obj})
+        get = slow.get
+
+        def slow_get(id):
+            released.wait(5)
+            return get(id)
+
+        slow.get = slow_get
+        thing_cls.bind(slow, fast, hedge=0.01)
+        try:
+            with app.test_request_context():
+                started_at = time.time()
+                thing = thing_cls.get(thing_cls.id.encode(obj.id))
+                assert time.time() - started_at < 5
+        finally:
+            released.set()
+        assert thing.obj is obj
+        assert fast.calls == [obj.id]
+
+    def test_context(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='a')
+        binding = DictBinding({obj.id: obj})
+        seen = []
+        get = binding.get
+
+        def context_get(id):
+            seen.append((
+                flask.current_app.name,
+                flask.request.path if flask.has_request_context() else None,
+            ))
+            return get(id)
+
+        binding.get = context_get
+        thing_cls.bind(binding, hedge=1)
+        id = thing_cls.id.encode(obj.id)
+        with app.test_request_context('/things'):
+            assert thing_cls.get(id).obj is obj
+        with app.app_context():
+            assert thing_cls.get(id).obj is obj
+        assert seen == [(app.name, '/things'), (app.name, None)]
+
+    def test_converter_route(self, app, thing_cls):
+        obj = Model(id=uuid.uuid4(), name='a')
+        binding = DictBinding({obj.id: obj})
+        thing_cls.bind(binding, hedge=1)
+        # the converter runs before flask 0.10 pushes any context to link in
+        thing_cls.registry.lazy_converters = True
+        app.testing = True
+        teardowns = []
+        app.teardown_request(teardowns.append)
+
+        @app.route('/things/<Thing:thing>/again')
+        def again(thing):
+            other = thing_cls.get(thing['id'])
+            return '{0} {1}'.format(other['name'], flask.request.view_args)
+
+        response = app.test_client().get(
+            '/things/{0}/again'.format(thing_cls.id.encode(obj.id))
+        )
+        assert response.status_code == 200
+        assert response.data.startswith(b'a ')
+        # the converter's and the view's, not again per hedged call
+        assert binding.calls == [obj.id, obj.id]
+        assert len(teardowns) == 1
+
+    def test_sequential_equivalent(self, app, thing_cls):
+        objs = [Model(id=uuid.uuid4(), name=str(i)) for i in range(3)]
+        first = DictBinding(dict((obj.id, obj) for obj in objs[:1]))
+        second = DictBinding(dict((obj.id, obj) for obj in objs[1:2]))
+        thing_cls.bind(first, second, hedge=1)
+        ids = [thing_cls.id.encode(obj.id) for obj in objs]
+        with app.test_request_context():
+            things = thing_cls.get_many(ids)
+        assert [getattr(thing, 'obj', None) for thing in things] == objs[:2] + [None]
+        assert second.calls == [obj.id for obj in objs[1:]]
+
+
+class TestCodecs(object):
+
+    values = (
+        [uuid.uuid4() for _ in range(100)] +
+        [uuid.UUID(int=0), uuid.UUID(int=1), uuid.UUID(int=2 ** 128 - 1)]
+    )
+
+    @pytest.mark.parametrize('encoding,fixed', [
+        ('hex', False),
+        ('base58', False),
+        ('base58', True),
+        ('base62', False),
+    ])
+    def test_round_trip(self, encoding, fixed):
+        codec = hags.codecs.Id(prefix='th-', encoding=encoding, fixed=fixed)
+        encoded = codec.encode_many(self.values)
+        assert encoded == [codec.encode(value) for value in self.values]
+        for value, text in zip(self.values, encoded):
+            assert codec.match(text)
+            assert codec.decode(text) == value
+            assert not codec.match('xx-' + text[3:])
+        if fixed or encoding == 'hex':
+            assert len(set(len(text) for text in encoded)) == 1
+
+    @pytest.mark.parametrize('encoding,fixed', [
+        ('hex', False),
+        ('base58', False),
+        ('base58', True),
+        ('base62', False),
+        ('base62', True),
+    ])
+    def test_match_is_decode(self, encoding, fixed):
+        codec = hags.codecs.Id(prefix='th-', encoding=encoding, fixed=fixed)
+        if encoding == 'hex':
+            chars, width = hags.codecs.base32_alphabet, 26
+        else:
+            alphabet = getattr(hags.codecs, encoding)
+            chars, width = alphabet.chars, alphabet.uuid_width
+        texts = [codec.encode(value) for value in self.values]
+        # zero padded (or not), too long and short
+        texts += ['th-' + chars[0] + text[3:] for text in texts[:10]]
+        texts += ['th-' + text[4:] for text in texts[:10]]
+        rnd = random.Random(0)
+        texts += [
+            'th-' + ''.join(
+                rnd.choice(chars) for _ in range(rnd.randint(1, width + 1))
+            )
+            for _ in range(1000)
+        ]
+        for text in texts:
+            try:
+                value = codec.decode(text)
+            except ValueError:
+                continue
+            # decodes so matches, and is what encodes
+            assert codec.match(text)
+            assert codec.encode(value) == text
+        for text in texts:
+            if not codec.match(text):
+                with pytest.raises(ValueError):
+                    codec.decode(text)
+
+    def test_hex_sorts(self):
+        codec = hags.codecs.Id(encoding='hex')
+        values = sorted(self.values)
+        assert sorted(codec.encode_many(values)) == codec.encode_many(values)
+        assert codec.decode(codec.encode(values[0]).upper()) == values[0]
+
+    def test_hex_strict(self):
+        codec = hags.codecs.Id(prefix='us-', encoding='hex')
+        alphabet = hags.codecs.base32_alphabet
+        text = codec.encode(uuid.UUID(int=1))
+        padded = text[:-1] + alphabet[alphabet.index(text[-1]) + 1]
+        with pytest.raises(ValueError):
+            codec.decode(padded)
+        with pytest.raises(ValueError):
+            codec.decode('us-' + '\u0663' * 26)  # ARABIC-INDIC DIGIT THREE
+
+    @pytest.mark.parametrize('encoding', ['hex', 'base58', 'base62'])
+    def test_invalid(self, encoding):
+        codec = hags.codecs.Id(prefix='th-', encoding=encoding)
+        for text in ['th-!!', 'xx-abc', 'th-']:
+            assert not codec.match(text)
+            with pytest.raises(ValueError):
+                codec.decode(text)